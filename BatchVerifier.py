@@ -0,0 +1,192 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+from BinPackingSolver import BinPackingSolver, UNKNOWN
+from FeasibilityCache import FeasibilityCache
+from JobMultiset import JobMultiset
+from Round import Round
+from SolveTrace import SolveTrace
+
+
+def parse_input_file(file_name: str) -> (int, Fraction, [(Fraction, int)], Fraction):
+    """
+    parses a file with the answers to the prompts of main.py
+    :param file_name:   path of the input file
+    :returns:           number of machines, competitive ratio, list of (job size, multiplicity) and the final job
+    """
+    with open(file_name) as f:
+        tokens = f.read().split()
+
+    m, c = int(tokens[0]), Fraction(tokens[1])
+    sub_rounds = []
+    final_job = None
+    index = 2
+    while index < len(tokens):
+        # both the README convention (job size 0) and the 'finish' command mark the final job
+        if tokens[index] == "finish" or Fraction(tokens[index]) == 0:
+            final_job = Fraction(tokens[index + 1])
+            break
+        multiplicity = int(tokens[index + 1])
+        if multiplicity == -1:
+            raise ValueError("assisted rounds can not be verified in batch mode")
+        sub_rounds.append((Fraction(tokens[index]), multiplicity))
+        index += 2
+    return m, c, sub_rounds, final_job
+
+
+def verify_sequence(
+        file_name: str,
+        timeout: int,
+        greedy_ratio: float,
+        final_greedy_ratio: float,
+        aggregate=False,
+        c: Fraction = None,
+        cache: FeasibilityCache = None,
+        trace_file: str = None,
+        configuration: BinPackingSolver = None
+) -> dict:
+    """
+    verifies the job sequence of an input file the same way main.py does interactively
+    :param file_name:           path of the input file
+    :param timeout:             timeout for the CP-SAT solver
+    :param greedy_ratio:        greedy ratio for all subrounds but the final one
+    :param final_greedy_ratio:  greedy ratio for the final subround
+    :param aggregate:           indicates whether the arc-flow model should be used
+    :param c:                   competitive ratio that replaces the one of the input file
+    :param cache:               feasibility cache shared with other runs, e.g. for other competitive ratios
+    :param trace_file:          file to which every solve is appended, None disables the trace
+    :param configuration:       solver whose configuration is used for the sequence, e.g. the backend and the
+                                presets given on the command line, None uses the default configuration with timeout
+                                and aggregate
+    :returns:                   dictionary with the file name, the result, the wall time, the failing subround and
+                                the scheduled rounds
+    """
+    start = time.time()
+    result = {"file": file_name, "passed": False, "time": 0.0, "failing": "", "stages": {}, "rounds": []}
+    try:
+        m, file_c, sub_rounds, final_job = parse_input_file(file_name)
+        if c is None:
+            c = file_c
+        if configuration is None:
+            solver = BinPackingSolver(m, c, timeout, aggregate)
+        else:
+            solver = configuration.create_solver(m, c)
+        if cache is not None:
+            solver.cache = cache
+        if trace_file is not None:
+            solver.trace = SolveTrace(trace_file)
+        result["stages"] = solver.solves_per_stage
+        rounds = [Round(1, m)]
+        jobs_so_far = JobMultiset(m)
+        sub_round_index = 0
+        for job_size, multiplicity in sub_rounds:
+            round_index = len(jobs_so_far) // m + 1
+            sub_round_index = 1 if len(jobs_so_far) % m == 0 else sub_round_index + 1
+            jobs_so_far.push(job_size, multiplicity)
+            cutoff_value = (solver.get_base_cutoff_value(jobs_so_far) + job_size) / c
+
+            sub_round = solver.solve(jobs_so_far, cutoff_value, job_size, multiplicity, False, greedy_ratio)
+            if sub_round is None:
+                result["failing"] = "%i.%i (%i x %s)" % (round_index, sub_round_index, multiplicity,
+                                                       str(float(job_size)))
+                # a timeout or rounded scaling does not prove that the subround is infeasible
+                if solver.last_report.get("result") == UNKNOWN:
+                    result["failing"] += " unknown"
+                return result
+            rounds[-1].add_sub_round(sub_round)
+            if rounds[-1].get_number_of_jobs_left() == 0:
+                rounds.append(Round(len(rounds) + 1, m))
+
+        if final_job is None or len(jobs_so_far) % m != 0:
+            result["failing"] = "final (previous round incomplete)"
+            return result
+        jobs_so_far.push(final_job)
+        cutoff_value = solver.get_base_cutoff_value(jobs_so_far) / c
+        last_sub_round = solver.solve(jobs_so_far, cutoff_value, final_job, 1, True, final_greedy_ratio)
+        if last_sub_round is None:
+            result["failing"] = "final (1 x %s)" % str(float(final_job))
+            if solver.last_report.get("result") == UNKNOWN:
+                result["failing"] += " unknown"
+            return result
+        rounds[-1].add_sub_round(last_sub_round)
+        result["rounds"] = rounds
+        result["passed"] = True
+        return result
+    except (OSError, ValueError, IndexError) as e:
+        result["failing"] = "invalid input: " + str(e)
+        return result
+    finally:
+        result["time"] = time.time() - start
+
+
+def collect_input_files(pattern: str) -> [str]:
+    """
+    :param pattern: a directory or a glob pattern
+    :returns:       the sorted list of matching input files
+    """
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.txt")
+    return sorted(glob.glob(pattern))
+
+
+def verify_all(
+        pattern: str,
+        timeout: int,
+        greedy_ratio: float,
+        final_greedy_ratio: float,
+        processes: int = None,
+        aggregate=False,
+        trace_file: str = None,
+        configuration: BinPackingSolver = None
+) -> [dict]:
+    """
+    verifies every input file matching the pattern on a process pool, one sequence per worker
+    :param pattern:             a directory or a glob pattern
+    :param timeout:             timeout for the CP-SAT solver
+    :param greedy_ratio:        greedy ratio for all subrounds but the final one
+    :param final_greedy_ratio:  greedy ratio for the final subround
+    :param processes:           number of worker processes, defaults to the number of CPUs, the CPUs are divided
+                                among them for CP-SAT unless the configuration sets the number of CP-SAT workers
+    :param aggregate:           indicates whether the arc-flow model should be used
+    :param trace_file:          file to which every solve is appended, None disables the trace
+    :param configuration:       solver whose configuration is used for every sequence, None uses the default one
+    :returns:                   the results in the order of the files
+    """
+    files = collect_input_files(pattern)
+    if len(files) == 0:
+        return []
+    processes = min(processes or os.cpu_count() or 1, len(files))
+    if processes > (os.cpu_count() or 1):
+        print("%i processes share %i CPUs, solves may end in timeouts" % (processes, os.cpu_count() or 1))
+    # CP-SAT uses all CPUs by default, so the processes share them instead of turning each other's solves into
+    # timeouts
+    configuration = BinPackingSolver(1, Fraction(1), timeout, aggregate) if configuration is None \
+        else configuration.create_solver(configuration.m, configuration.c)
+    if configuration.cp_workers is None:
+        configuration.cp_workers = max(1, (os.cpu_count() or 1) // processes)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(verify_sequence, file_name, timeout, greedy_ratio, final_greedy_ratio,
+                                   aggregate, None, None, trace_file, configuration)
+                   for file_name in files]
+        return [future.result() for future in futures]
+
+
+def print_results(results: [dict]):
+    """
+    prints a table with the result, the wall time and the failing subround of each file
+    """
+    width = max([len("file")] + [len(result["file"]) for result in results])
+    print("%s  %-6s  %10s  %s" % ("file".ljust(width), "result", "time [s]", "failing subround"))
+    for result in results:
+        print("%s  %-6s  %10.2f  %s" % (result["file"].ljust(width), "pass" if result["passed"] else "FAIL",
+                                         result["time"], result["failing"]))
+    print("%i of %i sequences verified" % (sum(result["passed"] for result in results), len(results)))
+
+    solves_per_stage = {}
+    for result in results:
+        for stage, count in result["stages"].items():
+            solves_per_stage[stage] = solves_per_stage.get(stage, 0) + count
+    print("solves decided by " + ", ".join("%s: %i" % item for item in solves_per_stage.items()))
@@ -1,39 +1,214 @@
 import math
+import time
+from collections import OrderedDict
 from fractions import Fraction
-import numpy as np
-from ortools.sat.python import cp_model
 
+from ConfigurationDP import solve_configurations
+from ConfigurationLP import ConfigurationLP
+from FeasibilityCache import FeasibilityCache
 from FinalSubRound import FinalSubRound
+from IntegerGrid import gcd, lcm
+from JobMultiset import JobMultiset
+from ParallelSearch import find_boundary
+from PreSolver import presolve
 from Round import Round
+from SolveSession import SolveSession
+from SolverPortfolio import solve_model
 from SubRound import SubRound
 
 
+# CP-SAT works with 64-bit integers, larger scaled instances have to be rounded
+MAX_SAFE_INTEGER = 2 ** 62
+
+# results of a solve, an unknown result is neither a schedule nor a proof of infeasibility
+FEASIBLE = "feasible"
+INFEASIBLE = "infeasible"
+UNKNOWN = "unknown"
+
+# factor by which the timeout grows when a search repeats an unknown solve
+ESCALATION_FACTOR = 4
+
+# number of unknown instances whose timeout is remembered, the least recently used one is forgotten first
+MAX_UNKNOWN_INSTANCES = 1024
+
+# searches for the number of jobs of a subround, see schedule_job_as_often_as_possible
+MULTIPLICITY_SEARCHES = ("linear", "galloping")
+
+# 'cp' solves with CP-SAT, 'dp' with the configuration search and 'auto' tries the configuration search on instances
+# with at most AUTO_MAX_SIZES job sizes for AUTO_NODE_LIMIT nodes before CP-SAT
+BACKENDS = ("cp", "dp", "auto")
+AUTO_MAX_SIZES = 30
+AUTO_NODE_LIMIT = 20000
+
+
 class BinPackingSolver:
 
-    def __init__(self, m: int, c: Fraction, timeout: int):
+    def __init__(
+            self,
+            m: int,
+            c: Fraction,
+            timeout: int,
+            aggregate=False,
+            cache_size=256,
+            multiplicity_search="linear",
+            workers=1,
+            use_presolve=True,
+            max_coefficient=None,
+            initial_timeout=None,
+            time_budget=None
+    ):
         """
-        :param m:           number of machines
-        :param c:           competitive ratio
-        :param timeout:     timeout for the CP-SAT solver
+        :param m:                   number of machines
+        :param c:                   competitive ratio
+        :param timeout:             timeout for the CP-SAT solver
+        :param aggregate:           indicates whether the arc-flow model over machine configurations should be used
+        :param cache_size:          number of instances remembered by the feasibility cache, 0 disables the cache
+        :param multiplicity_search: 'linear' increases the number of jobs one by one, 'galloping' uses exponential
+                                    probing followed by a binary search, a ValueError is raised for other values
+        :param workers:             number of probes that are solved at the same time in separate processes
+        :param use_presolve:        indicates whether lower bounds and packing heuristics are tried before CP-SAT
+        :param max_coefficient:     if the scaled cutoff value is larger, jobs are rounded up and the cutoff value
+                                    down so that no coefficient exceeds it, None keeps the exact scaling
+        :param initial_timeout:     timeout with which the searches start, it is multiplied by ESCALATION_FACTOR
+                                    while a result is unknown until it reaches timeout, None always uses timeout
+        :param time_budget:         seconds after which CP-SAT is no longer called and every undecided solve is
+                                    unknown, None means no limit
         """
         self.m = m
         self.c = c
         self.timeout = timeout
+        self.aggregate = aggregate
+        self.cache = FeasibilityCache(cache_size) if cache_size > 0 else None
+        if multiplicity_search not in MULTIPLICITY_SEARCHES:
+            raise ValueError("unknown multiplicity search " + multiplicity_search)
+        self.multiplicity_search = multiplicity_search
+        self.workers = workers
+        self.use_presolve = use_presolve
+        self.max_coefficient = max_coefficient
+        self.initial_timeout = timeout if initial_timeout is None else min(initial_timeout, timeout)
+        self.deadline = None if time_budget is None else time.monotonic() + time_budget
+        # longest timeout with which an instance remained unknown, keyed like the feasibility cache
+        self.unknown_timeouts = OrderedDict()
+        self.solves_per_stage = {}
+        self.last_report = {}
+        # SessionJournal that records accepted subrounds and infeasible instances, None disables it
+        self.journal = None
+        # SolveTrace that records every call of solve, None disables it
+        self.trace = None
+        # names of the SolverPortfolio presets that race in every CP-SAT call, unless the caller has its own
+        self.presets = ["default"]
+        self.presets_per_caller = {}
+        # number of CP-SAT workers, None keeps the default of CP-SAT
+        self.cp_workers = None
+        # indicates whether the machine loads are ordered to remove symmetric schedules
+        self.symmetry_breaking = False
+        # one of BACKENDS
+        self.backend = "auto"
+        # largest factor by which the machines of the final subround are multiplied if jobs are left
+        self.max_upscaling_factor = 5
+        # ConfigurationLP that proves infeasibility before the configuration search and CP-SAT, None disables it
+        self.lp_filter = None
+        # results of the upscaling searches of the current final solve, see FinalSubRound.upscale
+        self.upscaling_results = {}
 
-    def get_common_denominator(self, jobs: [Fraction]) -> int:
+    def create_solver(self, m: int, c: Fraction):
+        """
+        :param m:   number of machines
+        :param c:   competitive ratio
+        :returns:   a solver with the configuration of this one, e.g. for a sequence of the batch mode, it shares the
+                    trace and the time budget but has its own cache and LP filter
+        """
+        solver = BinPackingSolver(m, c, self.timeout, self.aggregate,
+                                  0 if self.cache is None else self.cache.capacity, self.multiplicity_search,
+                                  self.workers, self.use_presolve, self.max_coefficient, self.initial_timeout)
+        solver.deadline = self.deadline
+        solver.trace = self.trace
+        solver.presets = self.presets
+        solver.presets_per_caller = self.presets_per_caller
+        solver.cp_workers = self.cp_workers
+        solver.symmetry_breaking = self.symmetry_breaking
+        solver.backend = self.backend
+        solver.max_upscaling_factor = self.max_upscaling_factor
+        solver.lp_filter = None if self.lp_filter is None else ConfigurationLP()
+        return solver
+
+    def create_upscaling_solver(self, m: int):
+        """
+        :param m:   number of machines
+        :returns:   a solver with the configuration of this one for the additional machines of an upscaled final
+                    subround, it shares the trace and the time budget
+        """
+        solver = self.create_solver(m, self.c)
+        solver.cache = None
+        solver.workers = 1
+        return solver
+
+    def get_common_denominator(self, jobs: JobMultiset) -> int:
         """
         computes the smallest integer which can be used to scale c and all jobs to integers
         :param jobs:    jobs that need to be scaled
         :returns:       the lowest common multiple multiple of the denominators of c and all jobs
         """
-        current_lcm = self.c.denominator
-        for job in jobs:
-            current_lcm = np.lcm(current_lcm, job.denominator)
-        return current_lcm
+        return lcm(self.c.denominator, jobs.get_common_denominator())
+
+    def get_base_cutoff_value(self, jobs: JobMultiset) -> Fraction:
+        """
+        :param jobs:    jobs of the sequence so far
+        :returns:       the sum of the first job of every round, kept up to date by the jobs
+        """
+        return jobs.first_job_sum
+
+    def get_scaling(
+            self,
+            count_per_job_size: {Fraction: int},
+            cutoff_value: Fraction,
+            common_denominator: int
+    ) -> (Fraction, {Fraction: int}, int):
+        """
+        scales the jobs and the cutoff value to integers which are as small as possible
+        :param count_per_job_size:  number of jobs of each size that need to be scaled
+        :param cutoff_value:        maximum load on each machine
+        :param common_denominator:  a common multiple of the denominators of c and the job sizes, the result does
+                                    not depend on which one since the coefficients are divided by their gcd
+        :returns:                   the scale factor, the integer coefficient of each job size and the scaled cutoff
+        """
+        scale_factor = Fraction(common_denominator)
+        coefficient_per_job_size = {job: int(job * scale_factor) for job in count_per_job_size.keys()}
+        scaled_cutoff_value = math.floor(cutoff_value * scale_factor)
+        scale_factor, scaled_cutoff_value = self.divide_by_gcd(scale_factor, coefficient_per_job_size,
+                                                               scaled_cutoff_value)
+
+        limit = self.max_coefficient
+        total_load = sum(coefficient_per_job_size[job] * count for job, count in count_per_job_size.items())
+        if limit is None and max(total_load, scaled_cutoff_value) >= MAX_SAFE_INTEGER:
+            limit = MAX_SAFE_INTEGER // (sum(count_per_job_size.values()) + 1)
+            print("exact scaling exceeds 64-bit integers, job sizes are rounded")
+        if limit is not None and scaled_cutoff_value > limit:
+            # rounding the jobs up and the cutoff value down keeps every schedule of the rounded instance valid
+            factor = Fraction(limit, scaled_cutoff_value)
+            coefficient_per_job_size = {job: math.ceil(coefficient * factor)
+                                        for job, coefficient in coefficient_per_job_size.items()}
+            scale_factor, scaled_cutoff_value = self.divide_by_gcd(scale_factor * factor,
+                                                                   coefficient_per_job_size, limit)
+        return scale_factor, coefficient_per_job_size, scaled_cutoff_value
+
+    @staticmethod
+    def divide_by_gcd(scale_factor: Fraction, coefficient_per_job_size: {Fraction: int}, scaled_cutoff_value: int):
+        """
+        divides all coefficients by their greatest common divisor, the cutoff value can be rounded down since every
+        load is a multiple of it
+        :returns:   the new scale factor and cutoff value, the coefficients are updated in place
+        """
+        divisor = gcd(*coefficient_per_job_size.values())
+        if divisor <= 1:
+            return scale_factor, scaled_cutoff_value
+        for job in coefficient_per_job_size.keys():
+            coefficient_per_job_size[job] //= divisor
+        return scale_factor / divisor, scaled_cutoff_value // divisor
 
     def complete_round(
             self,
-            jobs: [Fraction],
+            jobs: JobMultiset,
             round_id: int,
             job_size: Fraction,
             ratio_for_greedy: float,
@@ -49,23 +224,38 @@ class BinPackingSolver:
         """
 
         result = Round(round_id, self.m)
-
-        # binary search the number of times the initial job can be scheduled additionally
-        base_cutoff_value = Fraction(0)
+        if self.journal is not None:
+            self.journal.record_round_search(round_id, job_size)
 
         # calculate lowest possible load on any machine before the round
-        for i in range(0, len(jobs), self.m):
-            base_cutoff_value += jobs[i]
-        base_cutoff_value += job_size
+        base_cutoff_value = self.get_base_cutoff_value(jobs) + job_size
 
         # schedule specified job size as often as possible
         subround, count = \
             self.schedule_job_as_often_as_possible((base_cutoff_value + job_size) / self.c, jobs, job_size,
                                                    ratio_for_greedy)
-        result.add_sub_round(subround)
-        print("SubRound with %i jobs of size %f was successfully scheduled." %
-              (subround.multiplicity, float(subround.job_size), ))
-        # complete round
+        if subround is None:
+            return None
+        self.accept_sub_round(result, subround)
+        return self.continue_round(jobs, result, ratio_for_greedy, precision)
+
+    def continue_round(
+            self,
+            jobs: JobMultiset,
+            result: Round,
+            ratio_for_greedy: float,
+            precision: int) -> Round:
+        """
+        completes a round whose first subrounds have already been scheduled
+        :param jobs:                jobs scheduled in previous rounds and in the first subrounds of this round
+        :param result:              the round with its first subrounds, the next subrounds are added
+        :param ratio_for_greedy:    which proportion of jobs should be
+        :param precision:           number of decimal places considered
+        :returns                    the scheduled round
+        """
+        # the first job of this round is already part of the jobs
+        base_cutoff_value = self.get_base_cutoff_value(jobs)
+        count = self.m - result.get_number_of_jobs_left()
         while count != self.m:
             # find smallest job size
             new_job_size = self.find_smallest_possible_job_size(base_cutoff_value, jobs, precision,
@@ -77,22 +267,31 @@ class BinPackingSolver:
             subround, multiplicity = self.schedule_job_as_often_as_possible((base_cutoff_value + new_job_size) / self.c,
                                                                             jobs, new_job_size,
                                                                             ratio_for_greedy)
-
-            result.add_sub_round(subround)
+            if subround is None:
+                return None
+            self.accept_sub_round(result, subround)
             count += multiplicity
-            print("SubRound with %i jobs of size %f was successfully scheduled." %
-                  (subround.multiplicity, float(subround.job_size),))
+        if self.cache is not None:
+            print(self.cache)
+        print(self.get_stage_summary())
         return result
 
+    def accept_sub_round(self, result: Round, subround: SubRound):
+        result.add_sub_round(subround)
+        if self.journal is not None:
+            self.journal.record_sub_round(result.index, subround)
+        print("SubRound with %i jobs of size %f was successfully scheduled." %
+              (subround.multiplicity, float(subround.job_size),))
+
     def find_smallest_possible_job_size(
             self,
             base_cutoff_value: Fraction,
-            jobs: [Fraction],
+            jobs: JobMultiset,
             precision: int,
             ratio_for_greedy: float,
     ):
         """
-        uses binary search to determine the smallest job that can be scheduled
+        uses a k-ary search with one probe per worker to determine the smallest job that can be scheduled
         :param base_cutoff_value:   summation of the first jobs in all rounds
         :param jobs:                previously scheduled jobs
         :param precision:           number of decimal points considered in the binary search
@@ -101,101 +300,520 @@ class BinPackingSolver:
         """
 
         print("Binary search for smallest possible job size")
-        # binary search the lowest job size that can be scheduled job_multiplicity times
-        optimal_job_size = None
-        low, high = jobs[-1], Fraction(round(base_cutoff_value / (self.c - 1), precision))
-        while low <= high:
-            # approximate the middle value to avoid that the rescaled jobs cause an integer overflow
-            tried_job_size = (low + high) / 2
-            tried_job_size = Fraction(round(tried_job_size, precision))
-            print(float(low), float(high), float(tried_job_size))
-            jobs.append(tried_job_size)
-            tried_sub_round = self.solve(jobs, (base_cutoff_value + tried_job_size) / self.c, tried_job_size,
-                                         1, False, ratio_for_greedy)
-            if tried_sub_round is None:
-                print('Success')
-                low = tried_job_size + Fraction(1, 10 ** precision)
-            else:
-                print('Failure')
-                high = tried_job_size - Fraction(1, 10 ** precision)
-                optimal_job_size = tried_job_size
-                jobs.pop()
+        # the job sizes are searched on a grid with the given number of decimal places, which also avoids that the
+        # rescaled jobs cause an integer overflow
+        resolution = 10 ** precision
+        lower = math.ceil(jobs.last() * resolution)
+        upper = math.floor(round(base_cutoff_value / (self.c - 1), precision) * resolution)
+        largest_job_size = upper
+        # the dual solution of the configuration LP is reused by the probes of this search only
+        if self.lp_filter is not None:
+            self.lp_filter.reset()
+
+        timeout = self.initial_timeout
 
-        return optimal_job_size
+        def probe(value):
+            tried_job_size = Fraction(value, resolution)
+            sub_round = self.solve(jobs.with_jobs(tried_job_size), (base_cutoff_value + tried_job_size) / self.c,
+                                   tried_job_size, 1, False, ratio_for_greedy, caller="binary search",
+                                   timeout=timeout)
+            return self.last_report["result"], sub_round, self.last_report.get("timed_out", False)
+
+        def is_feasible(result):
+            # a probe whose process failed returns None
+            return result is not None and result[0] == FEASIBLE
+
+        smallest_feasible = upper + 1
+        while lower <= upper:
+            # with k workers, k job sizes are probed at the same time and the interval is divided into k + 1 parts
+            boundary, results = find_boundary(lower, upper, probe, is_feasible, self.workers)
+            smallest_feasible = min(smallest_feasible, boundary)
+            for value, result in sorted(results.items()):
+                result, sub_round, _ = (UNKNOWN, None, True) if result is None else result
+                print(float(Fraction(value, resolution)), {FEASIBLE: "Success", INFEASIBLE: "Failure",
+                                                           UNKNOWN: "Unknown"}[result])
+                # results of other processes are not known to the cache and the journal of this process
+                tried_job_size = Fraction(value, resolution)
+                if self.workers > 1 and self.cache is not None and result != UNKNOWN:
+                    self.cache.store(jobs.with_jobs(tried_job_size), (base_cutoff_value + tried_job_size) / self.c,
+                                     None if sub_round is None else sub_round.schedule)
+                if self.workers > 1 and self.journal is not None and result == INFEASIBLE:
+                    self.journal.record_infeasible(len(jobs), tried_job_size, 1,
+                                                   (base_cutoff_value + tried_job_size) / self.c)
+
+            # unknown job sizes below the boundary might be feasible, they are searched again with a longer timeout
+            # if they timed out, all job sizes up to a proven infeasible one are infeasible
+            unknown = [value for value, result in results.items()
+                       if value < boundary and (result is None or (result[0] == UNKNOWN and result[2]))]
+            if len(unknown) == 0 or timeout >= self.timeout:
+                break
+            timeout = min(timeout * ESCALATION_FACTOR, self.timeout)
+            lower = max([lower - 1] + [value for value, result in results.items()
+                                       if result is not None and result[0] == INFEASIBLE and value < boundary]) + 1
+            upper = boundary - 1
+            print("Searching the job sizes from %f with a timeout of %f seconds" %
+                  (float(Fraction(lower, resolution)), timeout))
+
+        if smallest_feasible > largest_job_size:
+            return None
+        return Fraction(smallest_feasible, resolution)
 
     def schedule_job_as_often_as_possible(
             self,
             cutoff_value: Fraction,
-            jobs: [Fraction],
+            jobs: JobMultiset,
             job_size: Fraction,
             ratio_for_greedy: float
     ):
         """"
         iteratively increases the number of jobs with size job_size until the Subround can no longer be scheduled
         :param cutoff_value:        maximum value for resulting makespan
-        :param jobs:                previously scheduled jobs, scheduled jobs are appended
+        :param jobs:                previously scheduled jobs, the scheduled jobs are pushed
         :param job_size:            size of the jobs in the subround
         :param ratio_for_greedy:    the ratio of jobs which should be scheduled greedily
         :returns                    resulting subround, number of jobs that should be scheduled
         """
         print("Trying to schedule as many jobs of size %f as possible" % float(job_size))
+        if self.multiplicity_search == "galloping":
+            return self.search_multiplicity(cutoff_value, jobs, job_size, ratio_for_greedy)
 
-        # iterative search since successful solves are way faster than timeouts
+        # iterative search since successful solves are way faster than timeouts,
+        # consecutive solves only differ by one job so the previous schedule is reused
+        session = SolveSession(self.m)
         last_success = None
         for i in range(self.m - len(jobs) % self.m):
-            jobs.append(job_size)
-            sub_round = self.solve(jobs, cutoff_value, job_size, i + 1, False, ratio_for_greedy)
+            jobs.push(job_size)
+            sub_round = self.solve_escalating(jobs, cutoff_value, job_size, i + 1, ratio_for_greedy, session,
+                                              "multiplicity search")
             if sub_round is None:
-                for j in range(i):
-                    jobs.append(job_size)
+                jobs.pop()
+                print(session.get_summary(i + 1))
                 return last_success, i
             last_success = sub_round
+        print(session.get_summary(last_success.multiplicity))
         return last_success, last_success.multiplicity
 
+    def search_multiplicity(
+            self,
+            cutoff_value: Fraction,
+            jobs: JobMultiset,
+            job_size: Fraction,
+            ratio_for_greedy: float
+    ):
+        """"
+        finds the largest number of jobs with size job_size that can be scheduled by exponential probing followed
+        by a binary search, the feasibility is monotone in the number of jobs
+        :param cutoff_value:        maximum value for resulting makespan
+        :param jobs:                previously scheduled jobs, the scheduled jobs are pushed
+        :param job_size:            size of the jobs in the subround
+        :param ratio_for_greedy:    the ratio of jobs which should be scheduled greedily
+        :returns                    resulting subround, number of jobs that should be scheduled
+        """
+        def probe(multiplicity):
+            sub_round = self.solve_escalating(jobs.with_jobs(job_size, multiplicity), cutoff_value, job_size, multiplicity,
+                                              ratio_for_greedy, caller="multiplicity search")
+            return self.last_report["result"], sub_round
+
+        # search for the smallest number of jobs that can not be scheduled
+        first_failure, results = find_boundary(1, self.m - len(jobs) % self.m, probe,
+                                               lambda result: result is None or result[0] != FEASIBLE, self.workers,
+                                               gallop=True)
+        print("%i solves for %i jobs of size %f" % (len(results), first_failure - 1, float(job_size)))
+
+        # results of other processes are not known to the cache of this process
+        if self.workers > 1 and self.cache is not None:
+            for multiplicity, result in results.items():
+                if result is not None and result[0] != UNKNOWN:
+                    self.cache.store(jobs.with_jobs(job_size, multiplicity), cutoff_value,
+                                     None if result[1] is None else result[1].schedule)
+
+        jobs.push(job_size, first_failure - 1)
+        last_success = results.get(first_failure - 1)
+        return None if last_success is None else last_success[1], first_failure - 1
+
+    def solve_escalating(
+            self,
+            jobs: JobMultiset,
+            cutoff_value: Fraction,
+            job_size: Fraction,
+            multiplicity: int,
+            ratio_for_greedy: float,
+            session: SolveSession = None,
+            caller="verify"
+    ):
+        """
+        solves with the initial timeout and repeats an unknown solve with a timeout that is ESCALATION_FACTOR times
+        longer until the timeout of the solver is reached, the parameters are the ones of solve
+        :returns:   the subround, None if no schedule was found
+        """
+        timeout = self.initial_timeout
+        while True:
+            sub_round = self.solve(jobs, cutoff_value, job_size, multiplicity, False, ratio_for_greedy, session,
+                                   caller, timeout)
+            if sub_round is not None or not self.last_report.get("timed_out", False) or timeout >= self.timeout:
+                return sub_round
+            timeout = min(timeout * ESCALATION_FACTOR, self.timeout)
+
     def solve(self,
-              jobs: [Fraction],
+              jobs: JobMultiset,
               cutoff_value: Fraction,
               job_size: Fraction,
               multiplicity: int,
               final=False,
-              ratio_for_greedy=0.0):
+              ratio_for_greedy=0.0,
+              session: SolveSession = None,
+              caller="verify",
+              timeout: float = None):
+        """"
+        solves the bin packing problem with the given jobs, machines and cutoff value and records the solve in the
+        trace if there is one, the parameters are the ones of solve_instance
+        :param caller:  tag of the calling search in the trace, e.g. 'verify', 'binary search',
+                        'multiplicity search' or 'upscaling', it also selects the presets of CP-SAT
+        """
+        presets = self.presets_per_caller.get(caller, self.presets)
+        if self.trace is None:
+            return self.solve_instance(jobs, cutoff_value, job_size, multiplicity, final, ratio_for_greedy, session,
+                                       timeout, presets)
+        number_of_jobs = len(jobs)
+        start = time.perf_counter()
+        sub_round = self.solve_instance(jobs, cutoff_value, job_size, multiplicity, final, ratio_for_greedy, session,
+                                        timeout, presets)
+        self.trace.record_solve(caller, number_of_jobs, self.m, final, sub_round is not None,
+                                time.perf_counter() - start, self.last_report)
+        return sub_round
+
+    def solve_instance(self,
+                       jobs: JobMultiset,
+                       cutoff_value: Fraction,
+                       job_size: Fraction,
+                       multiplicity: int,
+                       final=False,
+                       ratio_for_greedy=0.0,
+                       session: SolveSession = None,
+                       timeout: float = None,
+                       presets: [str] = None):
         """"
         solves the bin packing problem with the given jobs, machines and cutoff value
-        :param jobs:               jobs from previous (sub-)rounds
+        :param jobs:               jobs from previous (sub-)rounds and the new jobs, they are not changed
         :param cutoff_value:       maximum value for the new makespan
         :param job_size:           size of the new jobs
         :param multiplicity:       number of times the job should be scheduled
         :param final:              indicates when a FinalSubRound should be returned
         :param ratio_for_greedy:   controls which jobs will be scheduled greedily
-        :returns                   a SubRound object if a schedule was found, else None
+        :param session:            previous assignment which is extended or used as hint, updated on success
+        :param timeout:            timeout for CP-SAT, None uses the timeout of the solver
+        :param presets:            presets of CP-SAT, None uses the presets of the solver
+        :returns                   a SubRound object if a schedule was found, else None. The result in last_report
+                                   tells whether the instance is infeasible or unknown
         """
-        model = cp_model.CpModel()
-        indicator_variables = {}
+        self.last_report = {}
+        self.upscaling_results = {}
+        if timeout is None:
+            timeout = self.timeout
+        if presets is None:
+            presets = self.presets
+        # the final subround may be upscaled and therefore does not use the cache
+        use_cache = self.cache is not None and not final
+        if use_cache:
+            found, schedule = self.cache.lookup(jobs, cutoff_value)
+            if found:
+                self.record_stage("cache")
+                self.last_report["result"] = INFEASIBLE if schedule is None else FEASIBLE
+            if found and schedule is not None:
+                return self.sub_round_from_schedule(schedule, cutoff_value, job_size, multiplicity)
+            elif found:
+                return None
+        # an instance that remained unknown is not solved again with the same timeout, and never again if the
+        # unknown result did not depend on the timeout
+        unknown_key = None
+        if len(self.unknown_timeouts) > 0 and not final:
+            unknown_key = FeasibilityCache.get_key(jobs, cutoff_value)
+            if self.unknown_timeouts.get(unknown_key, -1) >= timeout:
+                self.unknown_timeouts.move_to_end(unknown_key)
+                self.record_stage("cache")
+                self.last_report["result"] = UNKNOWN
+                self.last_report["timed_out"] = self.unknown_timeouts[unknown_key] != math.inf
+                return None
+
+        # at most 1 / job jobs of each run of equal jobs are scheduled greedily, so the split only depends on the
+        # runs and not on the number of jobs
+        greedy_threshold = Fraction(ratio_for_greedy) * cutoff_value
+        small_jobs = []
+        big_count_per_job_size = dict(jobs.count_per_job)
+        for job, count in jobs.runs:
+            if job < greedy_threshold:
+                small_count = min(count, job.denominator // job.numerator)
+                small_jobs.extend([job] * small_count)
+                big_count_per_job_size[job] -= small_count
+        big_count_per_job_size = {job: count for job, count in big_count_per_job_size.items() if count > 0}
+
+        scale_factor, coefficient_per_job_size, scaled_cutoff_value = \
+            self.get_scaling(big_count_per_job_size, cutoff_value, self.get_common_denominator(jobs))
+        self.last_report["big_jobs"] = len(jobs) - len(small_jobs)
+        self.last_report["small_jobs"] = len(small_jobs)
+        self.last_report["sizes"] = len(jobs.count_per_job)
+        self.last_report["scale_factor"] = scale_factor
+        self.last_report["max_coefficient"] = max([scaled_cutoff_value] + list(coefficient_per_job_size.values()))
+        # if the jobs were rounded up, infeasibility of the scaled instance does not prove anything
+        exact = all(coefficient == job * scale_factor for job, coefficient in coefficient_per_job_size.items())
 
-        small_jobs, big_jobs = [], []
-        last_job, count_for_job = 0, 0
-        for job in jobs:
-            if job != last_job:
-                count_for_job = 0
-                last_job = job
-            if job / cutoff_value < ratio_for_greedy and ((count_for_job+1) * job <= 1):
-                small_jobs.append(job)
-                count_for_job += 1
+        # group jobs by their coefficient, rounded job sizes may share one
+        multiplicity_per_job_size = {}
+        for job, count in big_count_per_job_size.items():
+            coefficient = coefficient_per_job_size[job]
+            multiplicity_per_job_size[coefficient] = multiplicity_per_job_size.get(coefficient, 0) + count
+
+        sub_round, stage, result = None, None, UNKNOWN
+        if session is not None:
+            indicator_variables = session.complete(multiplicity_per_job_size, scaled_cutoff_value, scale_factor)
+            if indicator_variables is not None:
+                sub_round = self.create_sub_round(indicator_variables, coefficient_per_job_size, big_count_per_job_size,
+                                                  small_jobs, cutoff_value, job_size, multiplicity, final)
+                if sub_round is not None:
+                    stage = "session"
+                    session.completed_directly += 1
+
+        # lower bounds prove infeasibility and packing heuristics feasibility without CP-SAT
+        if stage is None and self.use_presolve:
+            presolve_stage, assignments = presolve(multiplicity_per_job_size, scaled_cutoff_value, self.m)
+            if presolve_stage == "bound":
+                stage = presolve_stage
+                result = INFEASIBLE if exact else UNKNOWN
+            elif presolve_stage == "heuristic":
+                for indicator_variables in assignments:
+                    sub_round = self.create_sub_round(indicator_variables, coefficient_per_job_size, big_count_per_job_size,
+                                                      small_jobs, cutoff_value, job_size, multiplicity, final)
+                    if sub_round is not None:
+                        stage = presolve_stage
+                        break
+
+        # the configuration LP proves infeasibility of many instances which the bounds of the presolve can not decide
+        if stage is None and self.lp_filter is not None and exact:
+            job_per_coefficient = {coefficient: job for job, coefficient in coefficient_per_job_size.items()}
+            proven = self.lp_filter.proves_infeasibility(multiplicity_per_job_size, scaled_cutoff_value, self.m,
+                                                         job_per_coefficient)
+            self.last_report.update(self.lp_filter.last_statistics)
+            if proven:
+                stage, result = "lp", INFEASIBLE
+
+        # few job sizes are decided exactly by the configuration search, with 'auto' CP-SAT takes over at its limit
+        # and if the small jobs do not fit greedily into its schedule, since CP-SAT may find another one
+        if stage is None and (self.backend == "dp" or
+                              (self.backend == "auto" and len(multiplicity_per_job_size) <= AUTO_MAX_SIZES)):
+            indicator_variables = self.solve_by_configurations(multiplicity_per_job_size, scaled_cutoff_value,
+                                                               timeout)
+            if indicator_variables is not None:
+                sub_round = self.create_sub_round(indicator_variables, coefficient_per_job_size, big_count_per_job_size,
+                                                  small_jobs, cutoff_value, job_size, multiplicity, final)
+            if self.backend == "dp" or sub_round is not None or self.last_report["dp_status"] == "INFEASIBLE":
+                stage = "dp"
+            if self.last_report["dp_status"] == "INFEASIBLE" and exact:
+                result = INFEASIBLE
+
+        if stage is None:
+            stage = "cp"
+            if self.aggregate:
+                indicator_variables = self.solve_aggregated(multiplicity_per_job_size, scaled_cutoff_value, timeout,
+                                                            presets)
             else:
-                big_jobs.append(job)
+                indicator_variables = self.solve_per_machine(multiplicity_per_job_size, scaled_cutoff_value,
+                                                             session, scale_factor, timeout, presets)
+            if indicator_variables is not None:
+                sub_round = self.create_sub_round(indicator_variables, coefficient_per_job_size, big_count_per_job_size,
+                                                  small_jobs, cutoff_value, job_size, multiplicity, final)
+            elif self.last_report.get("cp_status") == "INFEASIBLE" and exact:
+                result = INFEASIBLE
 
-        scale_factor = self.get_common_denominator(big_jobs)
-        scaled_jobs = [int(job * scale_factor) for job in big_jobs]
+        self.record_stage(stage)
+        if sub_round is not None:
+            result = FEASIBLE
+        self.last_report["result"] = result
+        # only a time limit makes an unknown result depend on the timeout, an assignment whose small jobs do not fit
+        # greedily and a bound of a rounded instance stay the same with a longer one
+        self.last_report["timed_out"] = result == UNKNOWN and (
+                self.last_report.get("cp_status") == "UNKNOWN" or
+                (stage == "dp" and self.last_report.get("dp_status") == "LIMIT"))
+        if sub_round is not None and session is not None:
+            session.record(indicator_variables, scale_factor)
 
-        scaled_cutoff_value = int(scale_factor * cutoff_value)
+        # unknown instances are not cached since a longer timeout might decide them
+        if use_cache and result != UNKNOWN:
+            self.cache.store(jobs, cutoff_value, None if sub_round is None else sub_round.schedule)
+        if sub_round is not None:
+            return sub_round
+        if result == UNKNOWN and not final:
+            if unknown_key is None:
+                unknown_key = FeasibilityCache.get_key(jobs, cutoff_value)
+            self.unknown_timeouts[unknown_key] = max(timeout if self.last_report["timed_out"] else math.inf,
+                                                     self.unknown_timeouts.get(unknown_key, timeout))
+            self.unknown_timeouts.move_to_end(unknown_key)
+            if len(self.unknown_timeouts) > MAX_UNKNOWN_INSTANCES:
+                self.unknown_timeouts.popitem(last=False)
+        if self.journal is not None and result == INFEASIBLE and not final:
+            self.journal.record_infeasible(len(jobs) - multiplicity, job_size, multiplicity, cutoff_value)
+        return None
 
-        # group jobs by size
-        multiplicity_per_job_size = {}
-        for job in scaled_jobs:
-            if job in multiplicity_per_job_size:
-                multiplicity_per_job_size[job] += 1
+    def record_stage(self, stage: str):
+        """
+        counts which stage decided a solve
+        :param stage:   one of 'cache', 'session', 'bound', 'heuristic', 'lp', 'dp' and 'cp'
+        """
+        self.last_report["stage"] = stage
+        self.solves_per_stage[stage] = self.solves_per_stage.get(stage, 0) + 1
+
+    def get_cp_timeout(self, timeout: float = None):
+        """
+        :returns:   the timeout limited by the time budget, None if the time budget is exhausted
+        """
+        if timeout is None:
+            timeout = self.timeout
+        if self.deadline is not None:
+            timeout = min(timeout, self.deadline - time.monotonic())
+            if timeout <= 0:
+                print("time budget exhausted")
+                self.last_report["cp_status"] = "BUDGET_EXHAUSTED"
+                return None
+        return timeout
+
+    def get_stage_summary(self) -> str:
+        """
+        :returns:   the number of solves decided by each stage
+        """
+        summary = "solves decided by " + ", ".join("%s: %i" % (stage, count)
+                                                   for stage, count in self.solves_per_stage.items())
+        if self.lp_filter is not None:
+            summary += ", the LP filter decided %i of %i calls" % (self.lp_filter.decided, self.lp_filter.calls)
+        return summary
+
+    def create_sub_round(
+            self,
+            indicator_variables: {(int, int), int},
+            coefficient_per_job_size: {Fraction: int},
+            big_count_per_job_size: {Fraction: int},
+            small_jobs: [Fraction],
+            cutoff_value: Fraction,
+            job_size: Fraction,
+            multiplicity: int,
+            final: bool
+    ):
+        """
+        creates the (final) subround from the assignment of the big jobs by scheduling the small jobs greedily
+        :param indicator_variables:         number of jobs of each coefficient on each machine
+        :param coefficient_per_job_size:    maps the job sizes to their coefficients
+        :param big_count_per_job_size:      number of jobs of each size that are assigned by the indicator variables
+        :returns:                           the subround, None if the small jobs could not be scheduled greedily
+        """
+        # jobs sharing a coefficient are interchangeable since each job is at most as large as its coefficient
+        jobs_per_coefficient = {}
+        for job, count in big_count_per_job_size.items():
+            jobs_per_coefficient.setdefault(coefficient_per_job_size[job], []).append([job, count])
+        values_per_job_size = {}
+        for (coefficient, j), count in indicator_variables.items():
+            while count > 0:
+                job, available = jobs_per_coefficient[coefficient][-1]
+                used = min(count, available)
+                values_per_job_size[(job, j)] = values_per_job_size.get((job, j), 0) + used
+                if used == available:
+                    jobs_per_coefficient[coefficient].pop()
+                else:
+                    jobs_per_coefficient[coefficient][-1][1] -= used
+                count -= used
+        big_jobs = list(big_count_per_job_size.keys())
+
+        try:
+            if final:
+                return FinalSubRound(values_per_job_size, big_jobs, small_jobs, cutoff_value, job_size,
+                                     multiplicity, self.m, self.c, self)
             else:
-                multiplicity_per_job_size[job] = 1
+                return SubRound(values_per_job_size, big_jobs, small_jobs, cutoff_value, job_size,
+                                multiplicity, self.m, self.c)
+        except ValueError:
+            return None
+
+    def sub_round_from_schedule(
+            self,
+            schedule: [[Fraction]],
+            cutoff_value: Fraction,
+            job_size: Fraction,
+            multiplicity: int,
+            final=False
+    ) -> SubRound:
+        """
+        creates a subround from a complete schedule, e.g. one found in the feasibility cache
+        :param schedule:        jobs on each machine
+        :param cutoff_value:    maximum value for the new makespan
+        :param job_size:        size of the new jobs
+        :param multiplicity:    number of new jobs
+        :param final:           indicates whether a FinalSubRound with the (possibly upscaled) schedule is created
+        :returns:               the subround with the given schedule
+        """
+        jobs = [job for machine in schedule for job in machine]
+        indicator_values = {}
+        for j, machine in enumerate(schedule):
+            for job in machine:
+                indicator_values[(job, j)] = indicator_values.get((job, j), 0) + 1
+        sub_round_class = FinalSubRound if final else SubRound
+        return sub_round_class(indicator_values, jobs, [], cutoff_value, job_size, multiplicity, len(schedule), self.c)
+
+    def solve_by_configurations(
+            self,
+            multiplicity_per_job_size: {int: int},
+            scaled_cutoff_value: int,
+            timeout: float = None
+    ):
+        """
+        solves the model with the configuration search of ConfigurationDP, with the backend 'dp' it stops after the
+        timeout and with 'auto' after AUTO_NODE_LIMIT nodes
+        :param multiplicity_per_job_size:   number of jobs for each scaled job size
+        :param scaled_cutoff_value:         maximum load on each machine
+        :param timeout:                     timeout for the search, None uses the timeout of the solver
+        :returns:                           the number of jobs of each scaled size on each machine, None if no
+                                            schedule was found. The dp_status in last_report is 'LIMIT' if the
+                                            search was given up
+        """
+        node_limit = None
+        if self.backend == "dp":
+            timeout = self.get_cp_timeout(timeout)
+            if timeout is None:
+                self.last_report["dp_status"] = "LIMIT"
+                return None
+        else:
+            timeout, node_limit = None, AUTO_NODE_LIMIT
+        start = time.perf_counter()
+        indicator_variables, status, nodes = solve_configurations(multiplicity_per_job_size, scaled_cutoff_value,
+                                                                  self.m, timeout, node_limit)
+        self.last_report["dp_status"] = status
+        self.last_report["dp_nodes"] = nodes
+        self.last_report["dp_time"] = time.perf_counter() - start
+        return indicator_variables
+
+    def solve_per_machine(
+            self,
+            multiplicity_per_job_size: {int: int},
+            scaled_cutoff_value: int,
+            session: SolveSession = None,
+            scale_factor: Fraction = 1,
+            timeout: float = None,
+            presets: [str] = None
+    ):
+        """
+        solves the model with one integer variable for each combination of job size and machine
+        :param multiplicity_per_job_size:   number of jobs for each scaled job size
+        :param scaled_cutoff_value:         maximum load on each machine
+        :param session:                     provides the previous assignment as solution hint
+        :param scale_factor:                factor by which the jobs have been scaled
+        :param timeout:                     timeout for CP-SAT, None uses the timeout of the solver
+        :param presets:                     presets of CP-SAT, None uses the presets of the solver
+        :returns:                           the number of jobs of each scaled size on each machine, None if no
+                                            schedule was found
+        """
+        timeout = self.get_cp_timeout(timeout)
+        if timeout is None:
+            return None
+        # CP-SAT is imported on first use, many runs are decided without it
+        from ortools.sat.python import cp_model
+        model = cp_model.CpModel()
+        indicator_variables = {}
 
         # create indicator variables
         for job, mult in multiplicity_per_job_size.items():
@@ -208,27 +826,100 @@ class BinPackingSolver:
             model.Add(sum(indicator_variables[(job, j)] for j in range(self.m)) == mult)
 
         # ensure that the makespan is less than the cutoff value
+        loads = [sum(indicator_variables[(job, j)] * job for job in multiplicity_per_job_size.keys())
+                 for j in range(self.m)]
         for j in range(self.m):
-            model.Add(sum(indicator_variables[(job, j)] * job for job in multiplicity_per_job_size.keys())
-                      <= scaled_cutoff_value)
+            model.Add(loads[j] <= scaled_cutoff_value)
+
+        # machines are interchangeable, so only schedules with non-increasing loads are considered
+        if self.symmetry_breaking:
+            for j in range(self.m - 1):
+                model.Add(loads[j] >= loads[j + 1])
+
+        if session is not None:
+            session.add_hints(model, indicator_variables, scale_factor)
 
         # call solver
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = self.timeout
-        status = solver.Solve(model)
-
-        if status == cp_model.OPTIMAL:
-            try:  # greedy scheduling
-                if final:
-                    return FinalSubRound(indicator_variables, solver, big_jobs, small_jobs, cutoff_value, job_size,
-                                         multiplicity, self.m, self.c, scale_factor)
-                else:
-                    return SubRound(indicator_variables, solver, big_jobs, small_jobs, cutoff_value, job_size,
-                                    multiplicity, self.m, self.c, scale_factor)
-            except ValueError:
-                pass
-
-        # scheduling not successful, undo alteration of jobs parameter
-        for i in range(multiplicity):
-            jobs.pop()
-        return None
+        values, statistics = solve_model(model, indicator_variables, timeout,
+                                         self.presets if presets is None else presets, self.cp_workers)
+        self.last_report.update(statistics)
+        return values
+
+    def solve_aggregated(
+            self,
+            multiplicity_per_job_size: {int: int},
+            scaled_cutoff_value: int,
+            timeout: float = None,
+            presets: [str] = None
+    ):
+        """
+        solves the arc-flow model in which every unit of flow from the source to the sink is the configuration of
+        one machine, the size of the model depends on the job sizes and the cutoff value but not on m
+        :param multiplicity_per_job_size:   number of jobs for each scaled job size
+        :param scaled_cutoff_value:         maximum load on each machine
+        :param timeout:                     timeout for CP-SAT, None uses the timeout of the solver
+        :param presets:                     presets of CP-SAT, None uses the presets of the solver
+        :returns:                           the number of jobs of each size on each machine, None if no schedule
+                                            was found
+        """
+        timeout = self.get_cp_timeout(timeout)
+        if timeout is None:
+            return None
+        # job sizes are added in decreasing order so that every configuration corresponds to exactly one path
+        job_sizes = sorted(multiplicity_per_job_size.keys(), reverse=True)
+        nodes, arcs = {0}, set()
+        for job in job_sizes:
+            for tail in sorted(nodes):
+                for copies in range(min(multiplicity_per_job_size[job], scaled_cutoff_value // job)):
+                    head = tail + (copies + 1) * job
+                    if head > scaled_cutoff_value:
+                        break
+                    arcs.add((tail + copies * job, head, job))
+            nodes.update(head for (_, head, _) in arcs)
+
+        from ortools.sat.python import cp_model
+        model = cp_model.CpModel()
+        flow = {arc: model.NewIntVar(0, min(self.m, multiplicity_per_job_size[arc[2]]),
+                                     'flow_%i_%i_%i' % arc) for arc in arcs}
+        # every node is connected to the sink, the unused capacity of the machine is lost
+        loss = {node: model.NewIntVar(0, self.m, 'loss_%i' % node) for node in nodes}
+
+        incoming, outgoing = {node: [] for node in nodes}, {node: [loss[node]] for node in nodes}
+        flow_per_job_size = {job: [] for job in job_sizes}
+        for arc, variable in flow.items():
+            outgoing[arc[0]].append(variable)
+            incoming[arc[1]].append(variable)
+            flow_per_job_size[arc[2]].append(variable)
+
+        # m units of flow leave the source and the flow is conserved in all other nodes
+        model.Add(sum(outgoing[0]) == self.m)
+        for node in nodes:
+            if node != 0:
+                model.Add(sum(incoming[node]) == sum(outgoing[node]))
+
+        # ensure that each job is scheduled exactly once
+        for job in job_sizes:
+            model.Add(sum(flow_per_job_size[job]) == multiplicity_per_job_size[job])
+
+        remaining, statistics = solve_model(model, flow, timeout, self.presets if presets is None else presets,
+                                            self.cp_workers)
+        self.last_report.update(statistics)
+        if remaining is None:
+            return None
+
+        # decompose the flow into m paths from the source to the sink, one per machine
+        arcs_per_tail = {node: [] for node in nodes}
+        for arc in arcs:
+            arcs_per_tail[arc[0]].append(arc)
+
+        indicator_values = {(job, j): 0 for job in job_sizes for j in range(self.m)}
+        for j in range(self.m):
+            node = 0
+            while True:
+                arc = next((arc for arc in arcs_per_tail[node] if remaining[arc] > 0), None)
+                if arc is None:
+                    break
+                remaining[arc] -= 1
+                indicator_values[(arc[2], j)] += 1
+                node = arc[1]
+        return indicator_values
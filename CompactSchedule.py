@@ -0,0 +1,134 @@
+from array import array
+from fractions import Fraction
+
+from IntegerGrid import lcm
+
+
+class SizeTable:
+
+    def __init__(self):
+        """
+        assigns an id to every job size, all schedules share one table so each size is stored only once
+        """
+        self.sizes = []
+        self.ids = {}
+        self.denominator = 1
+
+    def get_id(self, size: Fraction) -> int:
+        if size not in self.ids:
+            self.ids[size] = len(self.sizes)
+            self.sizes.append(size)
+            self.denominator = lcm(self.denominator, size.denominator)
+        return self.ids[size]
+
+    def get_numerators(self, size_ids: "np.ndarray") -> "np.ndarray":
+        """
+        :param size_ids:    ids of job sizes
+        :returns:           the job sizes as integers on the grid 1 / denominator
+        """
+        import numpy as np
+        numerators = [self.sizes[size_id] * self.denominator for size_id in size_ids]
+        # fall back to Python integers if the loads might not fit into 64 bits
+        dtype = np.int64 if self.denominator < 2 ** 31 else object
+        return np.array([int(numerator) for numerator in numerators], dtype=dtype)
+
+
+SIZE_TABLE = SizeTable()
+
+
+class CompactSchedule:
+
+    def __init__(self, schedule: [[Fraction]], size_table: SizeTable = SIZE_TABLE):
+        """
+        stores a schedule as one row of job counts per machine type, machines with the same jobs share a type
+        :param schedule:    jobs on each machine
+        :param size_table:  table of job sizes shared by all schedules
+        """
+        self.size_table = size_table
+        compositions = []
+        for machine in schedule:
+            composition = {}
+            for job in machine:
+                size_id = size_table.get_id(job)
+                composition[size_id] = composition.get(size_id, 0) + 1
+            compositions.append(tuple(sorted(composition.items())))
+
+        type_per_composition = {}
+        machine_types = []
+        for composition in compositions:
+            if composition not in type_per_composition:
+                type_per_composition[composition] = len(type_per_composition)
+            machine_types.append(type_per_composition[composition])
+
+        # the (size id, count) pairs of each machine type in the order of their first machine
+        self.compositions = list(type_per_composition.keys())
+        self.machine_types = array("i", machine_types)
+        self.multiplicities = [0] * len(self.compositions)
+        for machine_type in machine_types:
+            self.multiplicities[machine_type] += 1
+        # the count matrix is built on first use, so numpy is only imported by the vectorized queries of the export
+        self.size_ids = None
+        self.counts = None
+
+    def get_count_matrix(self) -> ("np.ndarray", "np.ndarray"):
+        """
+        :returns:   the ids of the job sizes that occur in this schedule and the number of jobs of each of these sizes
+                    (columns) per machine type (rows)
+        """
+        if self.counts is None:
+            import numpy as np
+            self.size_ids = np.array(sorted(set(size_id for composition in self.compositions
+                                                for size_id, _ in composition)), dtype=np.int64)
+            column_per_size_id = {size_id: column for column, size_id in enumerate(self.size_ids)}
+            self.counts = np.zeros((len(self.compositions), len(self.size_ids)), dtype=np.int32)
+            for machine_type, composition in enumerate(self.compositions):
+                for size_id, count in composition:
+                    self.counts[machine_type, column_per_size_id[size_id]] = count
+        return self.size_ids, self.counts
+
+    def get_scaled_loads_per_type(self) -> "np.ndarray":
+        """
+        :returns:   the load of each machine type as integer on the grid of the size table
+        """
+        import numpy as np
+        size_ids, counts = self.get_count_matrix()
+        if len(size_ids) == 0:
+            return np.zeros(len(self.multiplicities), dtype=np.int64)
+        numerators = self.size_table.get_numerators(size_ids)
+        return counts.astype(numerators.dtype) @ numerators
+
+    def get_loads(self) -> [Fraction]:
+        """
+        :returns:   the load of each machine
+        """
+        loads_per_type = self.get_scaled_loads_per_type()
+        return [Fraction(int(loads_per_type[machine_type]), self.size_table.denominator)
+                for machine_type in self.machine_types]
+
+    def get_makespan(self) -> Fraction:
+        loads_per_type = self.get_scaled_loads_per_type()
+        if len(loads_per_type) == 0:
+            return Fraction(0)
+        return Fraction(int(max(loads_per_type)), self.size_table.denominator)
+
+    def get_compositions(self) -> [(int, {Fraction: int})]:
+        """
+        :returns:   for each machine type in the order of their first machine, the number of machines and the number
+                    of jobs of each size in decreasing order of size
+        """
+        sizes = self.size_table.sizes
+        return [(multiplicity, {sizes[size_id]: count
+                                for size_id, count in sorted(composition, key=lambda entry: sizes[entry[0]],
+                                                             reverse=True)})
+                for multiplicity, composition in zip(self.multiplicities, self.compositions)]
+
+    def to_tuples(self) -> ((Fraction, ...), ...):
+        """
+        :returns:   the jobs on each machine in decreasing order of size, machines of the same type share one tuple
+        """
+        machines_per_type = [tuple(job for job, count in composition.items() for _ in range(count))
+                             for _, composition in self.get_compositions()]
+        return tuple(machines_per_type[machine_type] for machine_type in self.machine_types)
+
+    def get_number_of_machines(self) -> int:
+        return len(self.machine_types)
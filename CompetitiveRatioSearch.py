@@ -0,0 +1,46 @@
+import math
+from fractions import Fraction
+
+from FeasibilityCache import FeasibilityCache
+from ParallelSearch import find_boundary
+
+
+def find_largest_competitive_ratio(
+        lower: Fraction,
+        upper: Fraction,
+        verify,
+        precision=3,
+        cache_size=4096
+):
+    """
+    bisects on the competitive ratio to find the largest one for which a job sequence can be verified, a larger
+    competitive ratio only lowers the cutoff values, so verification is monotone in c. All runs share one feasibility
+    cache: schedules found for a larger c stay valid for the higher cutoff values of a smaller c and infeasible
+    instances of a smaller c stay infeasible for a larger c
+    :param lower:       smallest competitive ratio that is considered
+    :param upper:       largest competitive ratio that is considered
+    :param verify:      function that gets the competitive ratio and the shared cache and returns a dictionary whose
+                        entry 'passed' indicates whether the sequence was verified
+    :param precision:   number of decimal places of the competitive ratio
+    :param cache_size:  number of instances remembered by the shared cache, 0 disables it
+    :returns:           the largest verified competitive ratio and the result of verify for it, (None, None) if no
+                        competitive ratio in the interval can be verified
+    """
+    cache = FeasibilityCache(cache_size) if cache_size > 0 else None
+    resolution = 10 ** precision
+
+    def probe(value):
+        c = Fraction(value, resolution)
+        print("Trying competitive ratio %s" % str(float(c)))
+        result = verify(c, cache)
+        print("c = %s %s, %s" % (str(float(c)), "verified" if result["passed"] else "failed",
+                                 "no cache" if cache is None else str(cache)))
+        return result
+
+    # the probes run in this process one after another so that each one profits from the cache of the previous ones
+    smallest_failing, results = find_boundary(math.ceil(lower * resolution), math.floor(upper * resolution), probe,
+                                              lambda result: not result["passed"])
+    largest_verified = smallest_failing - 1
+    if largest_verified not in results:
+        return None, None
+    return Fraction(largest_verified, resolution), results[largest_verified]
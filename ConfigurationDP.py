@@ -0,0 +1,95 @@
+import time
+
+from PreSolver import lower_bound_l2
+
+# machines are packed one per recursion level, more machines would exceed the recursion limit
+MAX_MACHINES = 500
+
+
+class SearchLimitReached(Exception):
+    pass
+
+
+def solve_configurations(
+        multiplicity_per_job_size: {int: int},
+        capacity: int,
+        m: int,
+        timeout: float = None,
+        node_limit: int = None
+) -> ({(int, int): int}, str, int):
+    """
+    decides whether the jobs fit on m machines by a depth-first search over the vector of remaining jobs per size:
+    every machine gets a configuration with the largest remaining job, only configurations to which no remaining
+    job can be added are tried, and vectors that could not be packed on k machines are memoized
+    :param multiplicity_per_job_size:   number of jobs for each scaled job size
+    :param capacity:                    maximum load on each machine
+    :param m:                           number of machines
+    :param timeout:                     time in seconds after which the search is given up, None means no limit
+    :param node_limit:                  number of search nodes after which the search is given up, None means no limit
+    :returns:                           the number of jobs of each scaled size on each machine (None if no schedule
+                                        was found), the status 'FEASIBLE', 'INFEASIBLE' or 'LIMIT' and the number
+                                        of search nodes
+    """
+    sizes = sorted(multiplicity_per_job_size.keys(), reverse=True)
+    if len(sizes) > 0 and sizes[0] > capacity:
+        return None, "INFEASIBLE", 0
+    if m > MAX_MACHINES:
+        return None, "LIMIT", 0
+    deadline = None if timeout is None else time.monotonic() + timeout
+    # largest number of machines on which the remaining jobs could not be packed
+    failed = {}
+    configurations = []
+    nodes = 0
+
+    def get_configurations(remaining: (int,), first: int):
+        """
+        yields the maximal configurations with at least one job of the largest remaining size, fuller ones first
+        """
+        configuration = [0] * len(sizes)
+
+        def extend(i: int, free: int):
+            if i == len(sizes):
+                # no remaining job fits into the free capacity
+                if all(remaining[j] == configuration[j] or sizes[j] > free for j in range(first, len(sizes))):
+                    yield tuple(configuration)
+                return
+            most = min(remaining[i], free // sizes[i])
+            for count in range(most, 0 if i == first else -1, -1):
+                configuration[i] = count
+                yield from extend(i + 1, free - count * sizes[i])
+            configuration[i] = 0
+
+        yield from extend(first, capacity)
+
+    def search(remaining: (int,), machines: int) -> bool:
+        nonlocal nodes
+        nodes += 1
+        if (node_limit is not None and nodes > node_limit) or \
+                (deadline is not None and nodes % 1024 == 0 and time.monotonic() > deadline):
+            raise SearchLimitReached()
+        first = next((i for i, count in enumerate(remaining) if count > 0), None)
+        if first is None:
+            return True
+        if machines == 0 or failed.get(remaining, -1) >= machines:
+            return False
+        if lower_bound_l2({sizes[i]: count for i, count in enumerate(remaining) if count > 0}, capacity) > machines:
+            failed[remaining] = machines
+            return False
+        for configuration in get_configurations(remaining, first):
+            if search(tuple(count - used for count, used in zip(remaining, configuration)), machines - 1):
+                configurations.append(configuration)
+                return True
+        failed[remaining] = machines
+        return False
+
+    try:
+        feasible = search(tuple(multiplicity_per_job_size[size] for size in sizes), m)
+    except SearchLimitReached:
+        return None, "LIMIT", nodes
+    if not feasible:
+        return None, "INFEASIBLE", nodes
+    indicator_values = {(size, j): 0 for size in sizes for j in range(m)}
+    for j, configuration in enumerate(configurations):
+        for size, count in zip(sizes, configuration):
+            indicator_values[(size, j)] = count
+    return indicator_values, "FEASIBLE", nodes
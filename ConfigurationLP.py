@@ -0,0 +1,195 @@
+import time
+from fractions import Fraction
+
+from ConfigurationDP import SearchLimitReached
+
+# column generation stops after this many LP solves without a decision
+MAX_ITERATIONS = 100
+
+# search nodes after which the exact pricing problem is given up
+MAX_KNAPSACK_NODES = 100000
+
+# a configuration improves the LP if its reduced cost is below -EPSILON
+EPSILON = 1e-9
+
+# number of generated columns that are kept for the next instances
+MAX_COLUMNS = 500
+
+
+def solve_knapsack(values: [object], sizes: [int], counts: [int], capacity: int, node_limit=None) -> (object, [int]):
+    """
+    solves the bounded knapsack problem by branch and bound, the values may be floats or fractions
+    :param values:      value of a job of each size
+    :param sizes:       scaled job sizes
+    :param counts:      largest number of jobs of each size
+    :param capacity:    maximum load of the machine
+    :param node_limit:  number of search nodes after which None is returned, None means no limit
+    :returns:           the largest value of a configuration and the configuration, (None, None) at the node limit
+    """
+    # only jobs with a positive value are packed, the most valuable per unit of size first
+    order = sorted((i for i in range(len(sizes)) if values[i] > 0), key=lambda i: values[i] / sizes[i], reverse=True)
+    best_value, best_configuration = 0, [0] * len(sizes)
+    configuration = [0] * len(sizes)
+    nodes = 0
+
+    def upper_bound(position: int, free: int):
+        # the fractional relaxation of the remaining jobs
+        bound = 0
+        for i in order[position:]:
+            count = min(counts[i], free // sizes[i])
+            bound += count * values[i]
+            free -= count * sizes[i]
+            if count < counts[i]:
+                return bound + values[i] * free / sizes[i]
+        return bound
+
+    def search(position: int, free: int, value):
+        nonlocal best_value, best_configuration, nodes
+        nodes += 1
+        if node_limit is not None and nodes > node_limit:
+            raise SearchLimitReached()
+        if value > best_value:
+            best_value, best_configuration = value, list(configuration)
+        if position == len(order) or value + upper_bound(position, free) <= best_value:
+            return
+        i = order[position]
+        for count in range(min(counts[i], free // sizes[i]), -1, -1):
+            configuration[i] = count
+            search(position + 1, free - count * sizes[i], value + count * values[i])
+        configuration[i] = 0
+
+    try:
+        search(0, capacity, 0)
+    except SearchLimitReached:
+        return None, None
+    return best_value, best_configuration
+
+
+class ConfigurationLP:
+
+    def __init__(self):
+        """
+        filter that proves infeasibility with the configuration LP of Gilmore and Gomory: every configuration of a
+        machine is a column, and if the fractional number of machines needed exceeds m the jobs do not fit. The
+        dual solution and the columns are kept by job size and reused by the next instance, e.g. the next probe of
+        a binary search
+        """
+        self.dual_per_job = {}
+        self.columns = []
+        self.calls = 0
+        self.decided = 0
+        self.last_statistics = {}
+
+    def reset(self):
+        """
+        forgets the dual solution and the columns
+        """
+        self.dual_per_job = {}
+        self.columns = []
+
+    def get_bound(self, duals: [float], sizes: [int], counts: [int], capacity: int):
+        """
+        any non-negative dual solution divided by the value of the best configuration is feasible for the dual LP,
+        so its objective is a lower bound on the number of machines, it is computed exactly with fractions
+        :returns:   the lower bound, None if the pricing problem was given up
+        """
+        duals = [Fraction(max(dual, 0.0)) for dual in duals]
+        value, _ = solve_knapsack(duals, sizes, counts, capacity, MAX_KNAPSACK_NODES)
+        if value is None or value == 0:
+            return None
+        return sum(dual * count for dual, count in zip(duals, counts)) / value
+
+    def proves_infeasibility(
+            self,
+            multiplicity_per_job_size: {int: int},
+            capacity: int,
+            m: int,
+            job_per_coefficient: {int: Fraction}
+    ) -> bool:
+        """
+        :param multiplicity_per_job_size:   number of jobs for each scaled job size
+        :param capacity:                    maximum load on each machine
+        :param m:                           number of machines
+        :param job_per_coefficient:         unscaled job size of each scaled job size, it identifies the sizes across
+                                            instances with different scalings
+        :returns:                           True if the jobs provably do not fit on m machines
+        """
+        start = time.perf_counter()
+        self.calls += 1
+        sizes = sorted(multiplicity_per_job_size.keys(), reverse=True)
+        counts = [multiplicity_per_job_size[size] for size in sizes]
+        jobs = [job_per_coefficient[size] for size in sizes]
+        self.last_statistics = {"lp_iterations": 0, "lp_columns": 0}
+        proven = self.run_column_generation(sizes, counts, jobs, capacity, m)
+        if proven:
+            self.decided += 1
+        self.last_statistics["lp_time"] = time.perf_counter() - start
+        return proven
+
+    def run_column_generation(self, sizes: [int], counts: [int], jobs: [Fraction], capacity: int, m: int) -> bool:
+        # the dual solution of the previous instance often proves infeasibility without solving an LP, sizes
+        # without a dual value get the share of the machine they occupy
+        duals = [self.dual_per_job.get(job, size / capacity) for job, size in zip(jobs, sizes)]
+        bound = self.get_bound(duals, sizes, counts, capacity)
+        if bound is not None and bound > m:
+            self.last_statistics["lp_bound"] = float(bound)
+            return True
+
+        # the LP solver is imported on first use like CP-SAT
+        from ortools.linear_solver import pywraplp
+        solver = pywraplp.Solver.CreateSolver("GLOP")
+        constraints = [solver.Constraint(count, solver.infinity()) for count in counts]
+        objective = solver.Objective()
+        objective.SetMinimization()
+
+        def add_column(configuration: [int]):
+            variable = solver.NumVar(0, solver.infinity(), "")
+            objective.SetCoefficient(variable, 1)
+            for constraint, count in zip(constraints, configuration):
+                if count > 0:
+                    constraint.SetCoefficient(variable, count)
+            self.last_statistics["lp_columns"] += 1
+
+        # one column per job size and the columns of the previous instances that still fit
+        for i, size in enumerate(sizes):
+            add_column([min(counts[i], capacity // size) if j == i else 0 for j in range(len(sizes))])
+        index_per_job = {job: i for i, job in enumerate(jobs)}
+        for column in self.columns:
+            configuration = [0] * len(sizes)
+            for job, count in column.items():
+                if job in index_per_job:
+                    configuration[index_per_job[job]] = min(count, counts[index_per_job[job]])
+            if 0 < sum(count * size for count, size in zip(configuration, sizes)) <= capacity:
+                add_column(configuration)
+
+        proven = False
+        for _ in range(MAX_ITERATIONS):
+            self.last_statistics["lp_iterations"] += 1
+            if solver.Solve() != pywraplp.Solver.OPTIMAL:
+                break
+            duals = [constraint.dual_value() for constraint in constraints]
+            self.dual_per_job.update(zip(jobs, duals))
+            # the restricted LP needs at most m machines, so the full LP does as well
+            if solver.Objective().Value() <= m + EPSILON:
+                break
+            value, configuration = solve_knapsack([max(dual, 0.0) for dual in duals], sizes, counts, capacity,
+                                                  MAX_KNAPSACK_NODES)
+            if value is None:
+                break
+            if value <= 1 + EPSILON:
+                # the LP is solved, its value is checked exactly
+                bound = self.get_bound(duals, sizes, counts, capacity)
+                proven = bound is not None and bound > m
+                break
+            bound = sum(max(dual, 0.0) * count for dual, count in zip(duals, counts)) / value
+            if bound > m:
+                bound = self.get_bound(duals, sizes, counts, capacity)
+                if bound is not None and bound > m:
+                    proven = True
+                    break
+            add_column(configuration)
+            self.columns.append({job: count for job, count in zip(jobs, configuration) if count > 0})
+        self.columns = self.columns[-MAX_COLUMNS:]
+        if proven:
+            self.last_statistics["lp_bound"] = float(bound)
+        return proven
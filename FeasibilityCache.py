@@ -0,0 +1,126 @@
+from collections import OrderedDict
+from fractions import Fraction
+
+from JobMultiset import JobMultiset
+
+
+class FeasibilityCache:
+
+    def __init__(self, capacity: int):
+        """
+        remembers the outcome of previous solves, an instance is identified by the number of jobs of each size and
+        the cutoff value, the least recently used entry is evicted first
+        :param capacity:    maximum number of stored instances
+        """
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.dominance_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(jobs: JobMultiset, cutoff_value: Fraction) -> (((Fraction, int), ...), Fraction):
+        """
+        :returns:   the job sizes with their number of jobs sorted by decreasing size together with the cutoff value
+        """
+        return tuple(sorted(jobs.count_per_job.items(), reverse=True)), cutoff_value
+
+    @staticmethod
+    def expand(counts: ((Fraction, int), ...)) -> [Fraction]:
+        """
+        :returns:   the jobs of a key sorted by decreasing size
+        """
+        return [job for job, count in counts for _ in range(count)]
+
+    @staticmethod
+    def is_dominated(smaller_jobs: ((Fraction, int), ...), larger_jobs: ((Fraction, int), ...)) -> bool:
+        """
+        :param smaller_jobs:    job sizes with their number of jobs sorted by decreasing size
+        :param larger_jobs:     job sizes with their number of jobs sorted by decreasing size
+        :returns:               True if every job in smaller_jobs can be matched to a distinct job in larger_jobs
+                                which is at least as large, i.e. for every size there are at least as many larger
+                                jobs of at least that size
+        """
+        i, unmatched = 0, 0
+        for job, count in smaller_jobs:
+            while i < len(larger_jobs) and larger_jobs[i][0] >= job:
+                unmatched += larger_jobs[i][1]
+                i += 1
+            unmatched -= count
+            if unmatched < 0:
+                return False
+        return True
+
+    @staticmethod
+    def transfer_schedule(
+            schedule: ((Fraction, ...), ...),
+            scheduled_jobs: ((Fraction, int), ...),
+            jobs: ((Fraction, int), ...)
+    ) -> [[Fraction]]:
+        """
+        replaces every job of a schedule by the matched job which is at most as large, unmatched jobs are removed
+        :param schedule:        jobs on each machine
+        :param scheduled_jobs:  the job sizes in schedule with their number of jobs sorted by decreasing size
+        :param jobs:            job sizes dominated by scheduled_jobs with their number of jobs sorted by decreasing
+                                size
+        :returns:               a schedule of jobs whose loads are at most the loads of the given schedule
+        """
+        scheduled_jobs, jobs = FeasibilityCache.expand(scheduled_jobs), FeasibilityCache.expand(jobs)
+        replacements = {}
+        for i, job in enumerate(scheduled_jobs):
+            replacements.setdefault(job, []).append(jobs[i] if i < len(jobs) else None)
+        result = []
+        for machine in schedule:
+            result.append([])
+            for job in machine:
+                replacement = replacements[job].pop()
+                if replacement is not None:
+                    result[-1].append(replacement)
+        return result
+
+    def lookup(self, jobs: JobMultiset, cutoff_value: Fraction):
+        """
+        answers a query by an exact hit or by an instance that dominates it, since adding jobs or lowering the cutoff
+        value can never turn an infeasible instance into a feasible one
+        :param jobs:            all jobs of the instance
+        :param cutoff_value:    maximum allowed makespan
+        :returns:               (True, schedule) if a schedule is known, (True, None) if the instance is known to be
+                                infeasible and (False, None) if the cache can not answer the query
+        """
+        key = self.get_key(jobs, cutoff_value)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            schedule = self.entries[key]
+            return True, None if schedule is None else [list(machine) for machine in schedule]
+
+        sorted_jobs = key[0]
+        for (cached_jobs, cached_cutoff_value), schedule in reversed(self.entries.items()):
+            if schedule is not None:
+                # a schedule of more or larger jobs within a lower cutoff value can be reused
+                if cached_cutoff_value <= cutoff_value and self.is_dominated(sorted_jobs, cached_jobs):
+                    self.entries.move_to_end((cached_jobs, cached_cutoff_value))
+                    self.dominance_hits += 1
+                    return True, self.transfer_schedule(schedule, cached_jobs, sorted_jobs)
+            elif cached_cutoff_value >= cutoff_value and self.is_dominated(cached_jobs, sorted_jobs):
+                self.entries.move_to_end((cached_jobs, cached_cutoff_value))
+                self.dominance_hits += 1
+                return True, None
+
+        self.misses += 1
+        return False, None
+
+    def store(self, jobs: JobMultiset, cutoff_value: Fraction, schedule: [[Fraction]]):
+        """
+        :param jobs:            all jobs of the instance
+        :param cutoff_value:    maximum allowed makespan
+        :param schedule:        jobs on each machine, None if the instance is infeasible
+        """
+        key = self.get_key(jobs, cutoff_value)
+        self.entries[key] = None if schedule is None else tuple(tuple(machine) for machine in schedule)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def __str__(self):
+        return "cache: %i hits, %i dominance hits, %i misses" % (self.hits, self.dominance_hits, self.misses)
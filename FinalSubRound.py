@@ -1,65 +1,124 @@
 from fractions import Fraction
 
-from ortools.sat.python import cp_model
-from ortools.sat.python.cp_model import IntVar
-
-import BinPackingSolver
+from JobMultiset import JobMultiset
+from ParallelSearch import ProbeRunner
 from SubRound import SubRound
 
 
 class FinalSubRound(SubRound):
 
+    def __init__(
+            self,
+            indicator_variables: {(Fraction, int), int},
+            jobs: [Fraction],
+            small_jobs: [Fraction],
+            cutoff_value: Fraction,
+            job_size: Fraction,
+            multiplicity: int,
+            m: int,
+            c: Fraction,
+            upscaling_solver=None
+    ):
+        """
+        :param upscaling_solver:    BinPackingSolver whose configuration is used to schedule the jobs that are left
+                                    after the greedy scheduling on additional machines, None disables the upscaling
+        the other parameters are the ones of SubRound
+        """
+        # the solver is only needed to compute the schedule
+        self.upscaling_solver = upscaling_solver
+        super().__init__(indicator_variables, jobs, small_jobs, cutoff_value, job_size, multiplicity, m, c)
+        self.upscaling_solver = None
+
     def set_schedule(
             self,
-            indicator_variables: {(int, int), IntVar},
+            indicator_variables: {(Fraction, int), int},
             scheduled_jobs: [Fraction],
-            small_jobs: [Fraction],
-            solver: cp_model,
-            scale_factor: int
+            small_jobs: [Fraction]
     ):
         """
-        overrides method of SubRound to allow upscaling
+        overrides method of SubRound to allow upscaling, if the remaining jobs can not be scheduled on more machines
+        an error is thrown
         :param indicator_variables: indicate how many jobs of each type are scheduled on each machine
         :param scheduled_jobs:      jobs that can be assigned with the indicator variables
         :param small_jobs:          jobs that need to be assigned greedily
-        :param solver:              contains the values for the indicator variables
-        :param scale_factor:        needed to map job sizes to indicator variables
         """
-        schedule = self.extract_indicator_variables(indicator_variables, scheduled_jobs, solver, scale_factor, self.m)
+        schedule = self.extract_indicator_variables(indicator_variables, scheduled_jobs, self.m)
         self.schedule_greedily(small_jobs, schedule)
 
         # try to fit the remaining jobs by increasing the number of machines
         if len(self.jobs_left) > 0:
-            multiply_by = 1
-            sub_round = None
-            while sub_round is None and multiply_by < 5:
-                multiply_by += 1
-                print('trying with %i jobs' % (self.m * multiply_by))
-                jobs = []
-                # create other instance of the CSP for upscaling
-                for _ in range(multiply_by):
-                    for job in self.jobs_left:
-                        jobs.append(job)
-                solver = BinPackingSolver.BinPackingSolver(multiply_by-1, self.c, 10)
-                sub_round = solver.solve(jobs, self.cutoff_value, 0, 0)
+            schedule = self.upscale(schedule)
 
-            if sub_round is None:
-                print('Upscaling not possible')
-                exit(1)
+        # sort the schedule for visual uniformity
+        self.grid.sort_by_load(schedule, reverse=True)
+        self.schedule = schedule
 
-            schedule.pop(0)
-            self.schedule = []
-            for _ in range(multiply_by):
-                for machine in schedule:
-                    self.schedule.append(machine)
-            self.schedule.extend(sub_round.schedule)
-            self.schedule.append([Fraction(1)])
-            self.m *= multiply_by
-        else:
-            self.schedule = schedule
+    def upscale(self, schedule: [[Fraction]]) -> [[Fraction]]:
+        """
+        with the factor k the sequence is repeated k times before the final job is released, so the schedule has to
+        contain k copies of all other jobs on k * m machines. The machine with the final job is used once and all
+        other machines k times, k copies of the jobs left and k - 1 copies of the other jobs on the machine of the
+        final job are scheduled on k - 1 additional machines. The factors are tried by the workers of the solver at
+        the same time and the smallest successful one is used
+        :param schedule:    schedule of the jobs that were not left
+        :returns:           the upscaled schedule, a ValueError is raised if no factor up to the maximum works
+        """
+        if self.upscaling_solver is None:
+            raise ValueError("The jobs left can not be scheduled without upscaling")
+        # the final job itself may be a small job that was left
+        final_machine = next((j for j, machine in enumerate(schedule) if self.job_size in machine), None)
+        if final_machine is None:
+            raise ValueError("The final job could not be scheduled")
+        other_jobs = list(schedule[final_machine])
+        other_jobs.remove(self.job_size)
+        largest_factor = self.upscaling_solver.max_upscaling_factor
 
-        # sort the schedule for visual uniformity
-        self.schedule.sort(reverse=True, key=lambda machine: (sum(machine), machine))
+        # every assignment tried by the final solve gets a subround, the search only depends on the jobs left and the
+        # other jobs on the machine of the final job, so it is done once for each of them
+        key = (tuple(sorted(self.jobs_left)), tuple(sorted(other_jobs)))
+        if key not in self.upscaling_solver.upscaling_results:
+            self.upscaling_solver.upscaling_results[key] = self.find_additional_machines(other_jobs, largest_factor)
+        best_factor, additional_machines = self.upscaling_solver.upscaling_results[key]
+
+        if best_factor is None:
+            print('Upscaling not possible')
+            raise ValueError("The jobs left can not be scheduled with up to %i times the machines" % largest_factor)
+        print('upscaled to %i machines' % (self.m * best_factor))
+        upscaled_schedule = [list(machine) for _ in range(best_factor)
+                             for j, machine in enumerate(schedule) if j != final_machine]
+        upscaled_schedule.append(schedule[final_machine])
+        upscaled_schedule.extend([list(machine) for machine in additional_machines])
+        self.jobs_left = []
+        self.m *= best_factor
+        return upscaled_schedule
+
+    def find_additional_machines(self, other_jobs: [Fraction], largest_factor: int) -> (int, [[Fraction]]):
+        """
+        :param other_jobs:      jobs on the machine of the final job except for the final job
+        :param largest_factor:  largest factor that is tried
+        :returns:               the smallest factor k for which k copies of the jobs left and k - 1 copies of the other
+                                jobs fit on k - 1 machines and their schedule, (None, None) if no factor works
+        """
+        def try_factor(factor: int):
+            print('trying with %i machines' % (self.m * factor))
+            jobs = JobMultiset(factor - 1, sorted(self.jobs_left * factor + other_jobs * (factor - 1)))
+            solver = self.upscaling_solver.create_upscaling_solver(factor - 1)
+            sub_round = solver.solve(jobs, self.cutoff_value, 0, 0, caller="upscaling")
+            return None if sub_round is None else sub_round.schedule
+
+        best_factor, additional_machines = None, None
+        with ProbeRunner(self.upscaling_solver.workers) as runner:
+            for factor in range(2, largest_factor + 1):
+                runner.submit(factor, try_factor, factor)
+            while runner.has_probes():
+                factor, result = runner.next_result()
+                if result is None or (best_factor is not None and factor > best_factor):
+                    continue
+                best_factor, additional_machines = factor, result
+                # only smaller factors can still improve the result
+                for larger_factor in range(factor + 1, largest_factor + 1):
+                    runner.cancel(larger_factor)
+        return best_factor, additional_machines
 
     def cost_on_different_machines(self, rounds: [Fraction], index: int, sub_round_index: int):
         """
@@ -0,0 +1,60 @@
+import heapq
+from fractions import Fraction
+
+from IntegerGrid import IntegerGrid
+
+
+def schedule_greedily(
+        small_jobs: [Fraction],
+        schedule: [[Fraction]],
+        cutoff_value: Fraction,
+        grid: IntegerGrid = None
+) -> [Fraction]:
+    """
+    schedules the small jobs in reversed order, each on the machine with the lowest load (ties are broken by
+    comparing the jobs on the machines) if it does not exceed the cutoff value there, the loads are kept as exact
+    integers in a min-heap, afterwards the machines are in the same order as if they had been sorted by load
+    before every job
+    :param small_jobs:      jobs that need to be scheduled greedily
+    :param schedule:        jobs on each machine, the small jobs are appended in place
+    :param cutoff_value:    maximum allowed load on each machine
+    :param grid:            converts the jobs to integers, a new one is created if none is given
+    :returns:               the jobs that could not be scheduled
+    """
+    jobs_left = []
+    if len(small_jobs) == 0:
+        return jobs_left
+
+    if grid is None:
+        grid = IntegerGrid(cutoff_value)
+    # all sizes are added first so that the grid is not refined while the integers are in use
+    grid.add_all(small_jobs)
+    grid.add_all([cutoff_value])
+    for machine in schedule:
+        grid.add_all(machine)
+    scaled_cutoff_value = grid.to_int(cutoff_value)
+    loads = grid.get_loads(schedule)
+
+    # only the machine at the top of the heap is modified, so its entry is replaced before the heap is used again
+    heap = [(load, machine, index) for index, (load, machine) in enumerate(zip(loads, schedule))]
+    heapq.heapify(heap)
+    last_index = None
+    for job in reversed(small_jobs):
+        load, machine, index = heap[0]
+        scaled_job = grid.to_int(job)
+        last_index = None
+        if load + scaled_job <= scaled_cutoff_value:
+            machine.append(job)
+            loads[index] += scaled_job
+            heapq.heapreplace(heap, (loads[index], machine, index))
+            last_index = index
+        else:
+            jobs_left.append(job)
+
+    # the machine which received the last job was the first one when the machines were sorted for the last time
+    order = sorted((index for index in range(len(schedule)) if index != last_index),
+                   key=lambda index: (loads[index], schedule[index]))
+    if last_index is not None:
+        order.insert(0, last_index)
+    schedule[:] = [schedule[index] for index in order]
+    return jobs_left
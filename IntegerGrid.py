@@ -0,0 +1,69 @@
+import math
+from fractions import Fraction
+from functools import reduce
+
+
+def gcd(*values: int) -> int:
+    """
+    :returns:   the greatest common divisor of the values, 0 for no values (math.gcd only takes several values since
+                Python 3.9)
+    """
+    return reduce(math.gcd, values, 0)
+
+
+def lcm(*values: int) -> int:
+    """
+    :returns:   the lowest common multiple of the values, 1 for no values (math.lcm only exists since Python 3.9)
+    """
+    return reduce(lambda a, b: a * b // math.gcd(a, b), values, 1)
+
+
+class IntegerGrid:
+
+    def __init__(self, c: Fraction):
+        """
+        maps job sizes to integers on the grid 1 / denominator so that sums and comparisons do not need to normalize
+        fractions, the denominator grows when a size with a new denominator is added
+        :param c:   competitive ratio, its denominator is part of the grid
+        """
+        self.denominator = c.denominator
+        self.numerators = {}
+
+    def add(self, size: Fraction):
+        """
+        adds a job size to the grid, refines the grid if necessary
+        """
+        if self.denominator % size.denominator != 0:
+            self.denominator = lcm(self.denominator, size.denominator)
+            self.numerators = {known_size: int(known_size * self.denominator) for known_size in self.numerators}
+        self.numerators[size] = int(size * self.denominator)
+
+    def add_all(self, sizes: [Fraction]):
+        for size in sizes:
+            if size not in self.numerators:
+                self.add(size)
+
+    def to_int(self, size: Fraction) -> int:
+        """
+        :returns:   the size as integer on the grid, integers returned before a refinement of the grid must not
+                    be combined with ones returned afterwards
+        """
+        if size not in self.numerators:
+            self.add(size)
+        return self.numerators[size]
+
+    def get_loads(self, schedule: [[Fraction]]) -> [int]:
+        """
+        :returns:   the load of each machine as integer on the grid
+        """
+        for machine in schedule:
+            self.add_all(machine)
+        return [sum(self.numerators[job] for job in machine) for machine in schedule]
+
+    def sort_by_load(self, schedule: [[Fraction]], reverse=False):
+        """
+        sorts the machines in place by their load, ties are broken by comparing the jobs on the machines
+        """
+        loads = self.get_loads(schedule)
+        order = sorted(range(len(schedule)), key=lambda j: (loads[j], schedule[j]), reverse=reverse)
+        schedule[:] = [schedule[j] for j in order]
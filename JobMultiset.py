@@ -0,0 +1,110 @@
+from fractions import Fraction
+
+from IntegerGrid import lcm
+
+
+class JobMultiset:
+
+    def __init__(self, m: int, jobs: [Fraction] = ()):
+        """
+        the jobs of a sequence in the order of their release, stored as runs of equal jobs together with the number
+        of jobs of each size, the sum of the first jobs of all rounds and the common denominator of the sizes, so
+        that pushing, popping and copying only depend on the number of runs and sizes but not on the number of jobs
+        :param m:       number of machines, every m-th job is the first job of a round
+        :param jobs:    jobs that are pushed one after another
+        """
+        self.m = m
+        self.runs = []
+        self.count_per_job = {}
+        self.length = 0
+        self.first_job_sum = Fraction(0)
+        # lowest common multiple of the denominators of all sizes, None if it has to be computed again
+        self.denominator = 1
+        for job in jobs:
+            self.push(job)
+
+    def get_number_of_round_starts(self, multiplicity: int) -> int:
+        """
+        :returns:   the number of jobs among the next multiplicity jobs that are the first job of a round
+        """
+        return (self.length + multiplicity + self.m - 1) // self.m - (self.length + self.m - 1) // self.m
+
+    def push(self, job: Fraction, multiplicity=1):
+        """
+        appends multiplicity jobs of the given size
+        """
+        if multiplicity <= 0:
+            return
+        self.first_job_sum += job * self.get_number_of_round_starts(multiplicity)
+        self.length += multiplicity
+        if len(self.runs) > 0 and self.runs[-1][0] == job:
+            self.runs[-1][1] += multiplicity
+        else:
+            self.runs.append([job, multiplicity])
+        if job not in self.count_per_job:
+            self.count_per_job[job] = 0
+            if self.denominator is not None:
+                self.denominator = lcm(self.denominator, job.denominator)
+        self.count_per_job[job] += multiplicity
+
+    def pop(self, multiplicity=1):
+        """
+        removes the last multiplicity jobs
+        """
+        while multiplicity > 0:
+            job, count = self.runs[-1]
+            removed = min(count, multiplicity)
+            self.length -= removed
+            self.first_job_sum -= job * self.get_number_of_round_starts(removed)
+            if removed == count:
+                self.runs.pop()
+            else:
+                self.runs[-1][1] -= removed
+            self.count_per_job[job] -= removed
+            if self.count_per_job[job] == 0:
+                del self.count_per_job[job]
+                self.denominator = None
+            multiplicity -= removed
+
+    def copy(self):
+        """
+        :returns:   a snapshot that can be changed without changing this multiset
+        """
+        result = JobMultiset(self.m)
+        result.runs = [list(run) for run in self.runs]
+        result.count_per_job = dict(self.count_per_job)
+        result.length = self.length
+        result.first_job_sum = self.first_job_sum
+        result.denominator = self.denominator
+        return result
+
+    def with_jobs(self, job: Fraction, multiplicity=1):
+        """
+        :returns:   a snapshot to which multiplicity jobs of the given size are appended
+        """
+        result = self.copy()
+        result.push(job, multiplicity)
+        return result
+
+    def get_common_denominator(self) -> int:
+        """
+        :returns:   the lowest common multiple of the denominators of all job sizes
+        """
+        if self.denominator is None:
+            self.denominator = lcm(*[job.denominator for job in self.count_per_job.keys()]) \
+                if len(self.count_per_job) > 0 else 1
+        return self.denominator
+
+    def get_total(self) -> Fraction:
+        return sum((job * count for job, count in self.count_per_job.items()), Fraction(0))
+
+    def last(self) -> Fraction:
+        return self.runs[-1][0]
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for job, count in self.runs:
+            for _ in range(count):
+                yield job
@@ -2,7 +2,7 @@ import SchedulePlotter
 from Round import Round
 
 
-def export(rounds: [Round], file_name: str, m: int, final_m: int, c: float, use_images=True):
+def export(rounds: [Round], file_name: str, m: int, final_m: int, c: float, use_images=True, processes=None):
     """
     Generates the latex source code for the proof
     :param rounds:          the rounds of the proof
@@ -11,6 +11,7 @@ def export(rounds: [Round], file_name: str, m: int, final_m: int, c: float, use_
     :param final_m:         number of machines in final round
     :param c:               competitive ratio
     :param use_images:      indicates whether images or tables should be used
+    :param processes:       number of processes drawing the figures, defaults to the number of CPUs
     """
     f = open(file_name, 'w')
 
@@ -27,6 +28,10 @@ def export(rounds: [Round], file_name: str, m: int, final_m: int, c: float, use_
     f.write("\\end{document}\n")
     f.close()
 
+    # the figures are collected while the text is written and drawn afterwards
+    rendered, skipped = SchedulePlotter.render_queued(processes)
+    print("%i figures drawn, %i figures were up to date" % (rendered, skipped))
+
 
 def write_overview(f, rounds: [Round], m: int, final_m: int, c: float):
     """
@@ -58,7 +63,8 @@ def write_overview(f, rounds: [Round], m: int, final_m: int, c: float):
             for subround in round.sub_rounds:
                 for _ in range(subround.multiplicity):
                     jobs.append([subround.job_size])
-            SchedulePlotter.plot_schedule(jobs, "overview_" + str(round.index), m, map_size_to_round=map_size_to_round)
+            SchedulePlotter.queue_schedule(jobs, "overview_" + str(round.index), m,
+                                           map_size_to_round=map_size_to_round)
 
 
 def write_analysis(f, rounds: [Round]):
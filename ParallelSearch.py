@@ -0,0 +1,155 @@
+import multiprocessing
+from multiprocessing.connection import wait
+
+
+def run_probe(connection, function, args):
+    """
+    entry point of a probe process, sends the result of the function back to the parent process
+    """
+    try:
+        connection.send(function(*args))
+    except BaseException as e:
+        # a failed probe proves nothing, it is reported like an unsuccessful one
+        print("probe failed: " + repr(e))
+        connection.send(None)
+    finally:
+        connection.close()
+
+
+class ProbeRunner:
+
+    def __init__(self, workers: int):
+        """
+        runs probes in separate processes so that probes which became irrelevant can be cancelled,
+        with a single worker the probes are evaluated in the calling process
+        :param workers:     maximum number of probes running at the same time
+        """
+        self.workers = workers
+        # probe processes are daemons which can not start processes, so their probes are evaluated one by one
+        parallel = workers > 1 and not multiprocessing.current_process().daemon
+        self.context = multiprocessing.get_context("fork") if parallel else None
+        self.pending = []
+        self.running = {}
+
+    def submit(self, key, function, *args):
+        """
+        :param key:         identifies the probe in the results
+        :param function:    function that is evaluated
+        :param args:        arguments of the function
+        """
+        self.pending.append((key, function, args))
+        self.start_pending()
+
+    def start_pending(self):
+        # without worker processes the probes are evaluated one by one in next_result
+        if self.context is None:
+            return
+        while len(self.pending) > 0 and len(self.running) < self.workers:
+            key, function, args = self.pending.pop(0)
+            receiver, sender = self.context.Pipe(duplex=False)
+            process = self.context.Process(target=run_probe, args=(sender, function, args), daemon=True)
+            process.start()
+            sender.close()
+            self.running[key] = (process, receiver)
+
+    def cancel(self, key):
+        """
+        removes a pending probe or terminates a running one
+        """
+        self.pending = [probe for probe in self.pending if probe[0] != key]
+        if key in self.running:
+            process, receiver = self.running.pop(key)
+            process.terminate()
+            process.join()
+            receiver.close()
+            self.start_pending()
+
+    def has_probes(self) -> bool:
+        return len(self.pending) + len(self.running) > 0
+
+    def next_result(self, timeout: float = None):
+        """
+        blocks until a probe is finished
+        :param timeout:     maximum waiting time in seconds, only used with worker processes
+        :returns:           key and result of the finished probe, None if the timeout expired
+        """
+        if self.context is None:
+            key, function, args = self.pending.pop(0)
+            return key, function(*args)
+        receivers = {receiver: key for key, (_, receiver) in self.running.items()}
+        ready = wait(list(receivers.keys()), timeout)
+        if len(ready) == 0:
+            return None
+        receiver = ready[0]
+        key = receivers[receiver]
+        process, _ = self.running.pop(key)
+        try:
+            result = receiver.recv()
+        except EOFError:
+            result = None
+        receiver.close()
+        process.join()
+        self.start_pending()
+        return key, result
+
+    def close(self):
+        for key in list(self.running.keys()):
+            self.cancel(key)
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def find_boundary(lower: int, upper: int, probe, accept, workers=1, gallop=False):
+    """
+    finds the smallest value in [lower, upper] whose probe result is accepted, acceptance has to be monotone,
+    i.e. if a value is accepted all larger values are accepted as well
+    :param lower:       smallest value that is considered
+    :param upper:       largest value that is considered
+    :param probe:       function that is evaluated for a value
+    :param accept:      decides for a probe result if the value is accepted
+    :param workers:     number of values that are probed at the same time
+    :param gallop:      indicates whether the values lower, lower + 1, lower + 3, lower + 7, ... should be probed
+                        before the interval is divided
+    :returns:           the smallest accepted value (upper + 1 if no value is accepted) and the results of all
+                        completed probes
+    """
+    results = {}
+    # all values up to largest_rejected are rejected and all values from smallest_accepted on are accepted
+    largest_rejected, smallest_accepted = lower - 1, upper + 1
+    step = 1
+
+    with ProbeRunner(workers) as runner:
+        while smallest_accepted - largest_rejected > 1:
+            if gallop:
+                candidates = []
+                while len(candidates) < workers and lower + step - 1 < smallest_accepted:
+                    candidates.append(min(lower + step - 1, upper))
+                    step *= 2
+                if len(candidates) == 0 or candidates[-1] == upper:
+                    gallop = False
+            else:
+                # divide the open interval into workers + 1 parts
+                distance = smallest_accepted - largest_rejected
+                candidates = [largest_rejected + distance * (i + 1) // (workers + 1) for i in range(workers)]
+            candidates = sorted(set(value for value in candidates if largest_rejected < value < smallest_accepted))
+
+            for value in candidates:
+                runner.submit(value, probe, value)
+            while runner.has_probes():
+                value, result = runner.next_result()
+                results[value] = result
+                if accept(result):
+                    smallest_accepted = min(smallest_accepted, value)
+                    irrelevant = [other for other in candidates if other > value]
+                else:
+                    largest_rejected = max(largest_rejected, value)
+                    irrelevant = [other for other in candidates if other < value]
+                for other in irrelevant:
+                    if other not in results:
+                        runner.cancel(other)
+    return smallest_accepted, results
@@ -0,0 +1,135 @@
+import getopt
+import json
+import sys
+import time
+
+from BatchVerifier import collect_input_files, parse_input_file
+from BinPackingSolver import BinPackingSolver, BACKENDS, FEASIBLE, INFEASIBLE, UNKNOWN
+from JobMultiset import JobMultiset
+import SolverPortfolio
+
+
+def collect_instances(pattern: str) -> [tuple]:
+    """
+    :returns:   the file, the number of machines, the competitive ratio, the jobs, the cutoff value, the job size and
+                the multiplicity of every subround of the input files, the final subrounds are left out since they
+                are upscaled
+    """
+    instances = []
+    for file_name in collect_input_files(pattern):
+        try:
+            m, c, sub_rounds, _ = parse_input_file(file_name)
+        except (OSError, ValueError, IndexError) as e:
+            print("%s is skipped: %s" % (file_name, str(e)))
+            continue
+        solver = BinPackingSolver(m, c, 1)
+        jobs = JobMultiset(m)
+        for job_size, multiplicity in sub_rounds:
+            jobs.push(job_size, multiplicity)
+            instances.append((file_name, m, c, jobs.copy(), (solver.get_base_cutoff_value(jobs) + job_size) / c,
+                              job_size, multiplicity))
+    return instances
+
+
+def parse_configuration(text: str) -> (str, [str]):
+    """
+    :param text:    a backend or presets joined by '+'
+    :returns:       the backend and the presets of CP-SAT
+    """
+    if text in BACKENDS:
+        return text, ["default"]
+    return "cp", SolverPortfolio.parse_presets(text.replace("+", ","))
+
+
+def run_configuration(instances, backend: str, presets: [str], timeout: int, greedy_ratio: float,
+                      symmetry_breaking: bool, cp_workers: int) -> [dict]:
+    """
+    solves every instance with the backend, the cache and the presolve are disabled so that no instance is decided
+    without it
+    :returns:   the result, the status, the winning preset and the wall time of every instance
+    """
+    results = []
+    for file_name, m, c, jobs, cutoff_value, job_size, multiplicity in instances:
+        solver = BinPackingSolver(m, c, timeout, cache_size=0, use_presolve=False)
+        solver.backend = backend
+        solver.presets = presets
+        solver.symmetry_breaking = symmetry_breaking
+        solver.cp_workers = cp_workers
+        start = time.perf_counter()
+        solver.solve(jobs, cutoff_value, job_size, multiplicity, False, greedy_ratio, caller="benchmark")
+        results.append({"file": file_name, "jobs": len(jobs), "result": solver.last_report["result"],
+                        "status": solver.last_report.get("cp_status", solver.last_report.get("dp_status")),
+                        "preset": solver.last_report.get("preset"),
+                        "time": time.perf_counter() - start})
+    return results
+
+
+if __name__ == '__main__':
+    # default values for command line options
+    pattern = "Inputs/"
+    configurations = list(SolverPortfolio.PRESETS.keys()) + ["dp"]
+    timeout = 10
+    greedy_ratio = 0.01
+    symmetry_breaking = False
+    cp_workers = None
+    output = None
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "i:c:t:g:o:",
+                                   ["input=", "configurations=", "timeout=", "greedy_ratio=", "output=",
+                                    "symmetry_breaking", "cp_workers="])
+        for opt, arg in opts:
+            if opt in ("-i", "--input"):
+                pattern = arg
+            elif opt in ("-c", "--configurations"):
+                # presets that race are joined by '+', e.g. default,feasibility+infeasibility,dp
+                configurations = arg.split(",")
+            elif opt in ("-t", "--timeout"):
+                timeout = int(arg)
+            elif opt in ("-g", "--greedy_ratio"):
+                greedy_ratio = float(arg)
+            elif opt in ("-o", "--output"):
+                output = arg
+            elif opt == "--symmetry_breaking":
+                symmetry_breaking = True
+            elif opt == "--cp_workers":
+                cp_workers = int(arg)
+    except (getopt.GetoptError, ValueError) as e:
+        print("Command line arguments could not be parsed: " + str(e))
+        exit(1)
+
+    try:
+        backend_and_presets = {name: parse_configuration(name) for name in configurations}
+    except ValueError as e:
+        print(e)
+        exit(1)
+
+    instances = collect_instances(pattern)
+    print("%i instances" % len(instances))
+    results_per_configuration = {}
+    for name, (backend, presets) in backend_and_presets.items():
+        results_per_configuration[name] = run_configuration(instances, backend, presets, timeout, greedy_ratio,
+                                                            symmetry_breaking, cp_workers)
+
+    # an instance is won by the configuration that decides it in the shortest time
+    wins = {name: 0 for name in results_per_configuration.keys()}
+    for i in range(len(instances)):
+        decided = [(results[i]["time"], name) for name, results in results_per_configuration.items()
+                   if results[i]["result"] != UNKNOWN]
+        if len(decided) > 0:
+            wins[min(decided)[1]] += 1
+
+    print("%-28s  %8s  %10s  %8s  %6s  %10s" % ("configuration", "feasible", "infeasible", "unknown", "wins",
+                                                "time [s]"))
+    record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "timeout": timeout, "instances": len(instances),
+              "symmetry_breaking": symmetry_breaking, "configurations": {}}
+    for name, results in results_per_configuration.items():
+        counts = {result: sum(entry["result"] == result for entry in results)
+                  for result in (FEASIBLE, INFEASIBLE, UNKNOWN)}
+        total_time = sum(entry["time"] for entry in results)
+        print("%-28s  %8i  %10i  %8i  %6i  %10.3f" % (name, counts[FEASIBLE], counts[INFEASIBLE], counts[UNKNOWN],
+                                                     wins[name], total_time))
+        record["configurations"][name] = dict(counts, wins=wins[name], time=total_time)
+    # the measurements are appended so that the presets can be compared over time
+    if output is not None:
+        with open(output, "a") as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,92 @@
+import math
+
+
+def lower_bound_l1(multiplicity_per_job_size: {int: int}, capacity: int) -> int:
+    """
+    :param multiplicity_per_job_size:   number of jobs for each scaled job size
+    :param capacity:                    maximum load on each machine
+    :returns:                           the number of machines needed to fit the total load
+    """
+    total_load = sum(job * mult for job, mult in multiplicity_per_job_size.items())
+    if total_load == 0:
+        return 0
+    return math.ceil(total_load / capacity) if capacity > 0 else math.inf
+
+
+def lower_bound_l2(multiplicity_per_job_size: {int: int}, capacity: int) -> int:
+    """
+    computes the lower bound L2 of Martello and Toth on the number of machines
+    :param multiplicity_per_job_size:   number of jobs for each scaled job size
+    :param capacity:                    maximum load on each machine
+    :returns:                           the number of machines needed, infinity if a job does not fit at all
+    """
+    if any(job > capacity for job in multiplicity_per_job_size.keys()):
+        return math.inf
+
+    result = 0
+    thresholds = [0] + [job for job in multiplicity_per_job_size.keys() if 2 * job <= capacity]
+    for threshold in thresholds:
+        # jobs that do not fit next to a job of size threshold, remaining large jobs and jobs of medium size
+        number_of_large_jobs, free_capacity, medium_load = 0, 0, 0
+        for job, mult in multiplicity_per_job_size.items():
+            if job > capacity - threshold:
+                number_of_large_jobs += mult
+            elif 2 * job > capacity:
+                number_of_large_jobs += mult
+                free_capacity += (capacity - job) * mult
+            elif job >= threshold:
+                medium_load += job * mult
+        bound = number_of_large_jobs + max(0, math.ceil((medium_load - free_capacity) / capacity))
+        result = max(result, bound)
+    return result
+
+
+def pack_decreasing(multiplicity_per_job_size: {int: int}, capacity: int, m: int, best_fit: bool):
+    """
+    packs the jobs by decreasing size with first fit or best fit
+    :param multiplicity_per_job_size:   number of jobs for each scaled job size
+    :param capacity:                    maximum load on each machine
+    :param m:                           number of machines
+    :param best_fit:                    indicates whether the fullest machine the job fits on is chosen instead of
+                                        the first one
+    :returns:                           the number of jobs of each scaled size on each machine, None if the
+                                        heuristic needs more than m machines
+    """
+    loads = [0] * m
+    result = {(job, j): 0 for job in multiplicity_per_job_size.keys() for j in range(m)}
+    for job in sorted(multiplicity_per_job_size.keys(), reverse=True):
+        for _ in range(multiplicity_per_job_size[job]):
+            fitting_machines = [j for j in range(m) if loads[j] + job <= capacity]
+            if len(fitting_machines) == 0:
+                return None
+            if best_fit:
+                machine = max(fitting_machines, key=lambda j: loads[j])
+            else:
+                machine = fitting_machines[0]
+            loads[machine] += job
+            result[(job, machine)] += 1
+    return result
+
+
+def presolve(multiplicity_per_job_size: {int: int}, capacity: int, m: int):
+    """
+    decides an instance without CP-SAT if possible
+    :param multiplicity_per_job_size:   number of jobs for each scaled job size
+    :param capacity:                    maximum load on each machine
+    :param m:                           number of machines
+    :returns:                           ('bound', None) if a lower bound proves infeasibility,
+                                        ('heuristic', assignments) with the packings found by first fit decreasing
+                                        and best fit decreasing and (None, None) if the instance is undecided
+    """
+    if max(lower_bound_l1(multiplicity_per_job_size, capacity),
+           lower_bound_l2(multiplicity_per_job_size, capacity)) > m:
+        return "bound", None
+
+    assignments = []
+    for best_fit in (False, True):
+        assignment = pack_decreasing(multiplicity_per_job_size, capacity, m, best_fit)
+        if assignment is not None:
+            assignments.append(assignment)
+    if len(assignments) > 0:
+        return "heuristic", assignments
+    return None, None
@@ -0,0 +1,219 @@
+import json
+import sys
+import time
+from fractions import Fraction
+
+from IntegerGrid import lcm
+
+CERTIFICATE_VERSION = 1
+
+
+def create_certificate(rounds, m: int, c: Fraction) -> dict:
+    """
+    creates a certificate of a finished proof, every job size is stored once and the witness schedules refer to the
+    sizes by their index
+    :param rounds:  the rounds of the proof, the last round only contains the final subround
+    :param m:       number of machines
+    :param c:       competitive ratio
+    :returns:       a dictionary that can be written as JSON
+    """
+    sizes = []
+    size_ids = {}
+
+    def get_size_id(size: Fraction) -> int:
+        if size not in size_ids:
+            size_ids[size] = len(sizes)
+            sizes.append(size)
+        return size_ids[size]
+
+    def encode(sub_round) -> dict:
+        schedule = [[multiplicity, [[get_size_id(job), count] for job, count in composition.items()]]
+                    for multiplicity, composition in sub_round.compact_schedule.get_compositions()]
+        return {"size": get_size_id(sub_round.job_size), "multiplicity": sub_round.multiplicity,
+                "cutoff": str(sub_round.cutoff_value), "schedule": schedule}
+
+    final_sub_round = rounds[-1].sub_rounds[-1]
+    certificate = {
+        "version": CERTIFICATE_VERSION,
+        "m": m,
+        "c": str(c),
+        "final_m": final_sub_round.m,
+        "rounds": [[encode(sub_round) for sub_round in round.sub_rounds] for round in rounds[:-1]],
+        "final": encode(final_sub_round)
+    }
+    certificate["sizes"] = [str(size) for size in sizes]
+    return certificate
+
+
+def write_certificate(certificate: dict, file_name: str):
+    with open(file_name, "w") as f:
+        json.dump(certificate, f, separators=(",", ":"))
+
+
+def read_certificate(file_name: str) -> dict:
+    with open(file_name) as f:
+        return json.load(f)
+
+
+def parse_fraction(value) -> Fraction:
+    """
+    :returns:   the fraction given as string, None if the value is not a valid fraction
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return Fraction(value)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def is_count(value, smallest=1) -> bool:
+    """
+    :returns:   True if the value is an integer (booleans are not) and at least smallest
+    """
+    return isinstance(value, int) and not isinstance(value, bool) and value >= smallest
+
+
+def check_structure(certificate) -> [str]:
+    """
+    checks that all entries of the certificate exist and have the right type, that every size id refers to a size and
+    that all numbers of machines, jobs and multiplicities are positive, negative ones could cancel real load
+    :returns:   a description of every violation, an empty list if the verification can rely on the structure
+    """
+    if not isinstance(certificate, dict):
+        return ["the certificate is not a JSON object"]
+    missing = [key for key in ("version", "m", "c", "final_m", "sizes", "rounds", "final") if key not in certificate]
+    if len(missing) > 0:
+        return ["missing entries: " + ", ".join(missing)]
+    if certificate["version"] != CERTIFICATE_VERSION:
+        return ["unsupported certificate version %s" % str(certificate["version"])]
+    errors = []
+    if not is_count(certificate["m"]) or not is_count(certificate["final_m"]):
+        errors.append("m and final_m must be positive integers")
+    c = parse_fraction(certificate["c"])
+    if c is None or c <= 0:
+        errors.append("c must be a positive fraction")
+    sizes = certificate["sizes"]
+    if not isinstance(sizes, list) or any(parse_fraction(size) is None or parse_fraction(size) <= 0
+                                          for size in sizes):
+        return errors + ["all job sizes must be positive fractions"]
+
+    def is_size_id(value) -> bool:
+        return is_count(value, 0) and value < len(sizes)
+
+    def check_sub_round(name: str, sub_round):
+        if not isinstance(sub_round, dict) or any(key not in sub_round for key in
+                                                  ("size", "multiplicity", "cutoff", "schedule")):
+            errors.append("%s: the subround needs a size, a multiplicity, a cutoff and a schedule" % name)
+            return
+        if not is_size_id(sub_round["size"]):
+            errors.append("%s: unknown size id %s" % (name, str(sub_round["size"])))
+        if not is_count(sub_round["multiplicity"]):
+            errors.append("%s: the multiplicity must be a positive integer" % name)
+        if parse_fraction(sub_round["cutoff"]) is None:
+            errors.append("%s: the cutoff value is not a fraction" % name)
+        schedule = sub_round["schedule"]
+        if not isinstance(schedule, list):
+            errors.append("%s: the schedule is not a list" % name)
+            return
+        for machine_type in schedule:
+            if not isinstance(machine_type, list) or len(machine_type) != 2 or not is_count(machine_type[0]) \
+                    or not isinstance(machine_type[1], list):
+                errors.append("%s: every machine type needs a positive multiplicity and a composition" % name)
+                continue
+            for entry in machine_type[1]:
+                if not isinstance(entry, list) or len(entry) != 2 or not is_size_id(entry[0]) \
+                        or not is_count(entry[1]):
+                    errors.append("%s: every composition entry needs a known size id and a positive count" % name)
+
+    if not isinstance(certificate["rounds"], list) or \
+            not all(isinstance(sub_rounds, list) for sub_rounds in certificate["rounds"]):
+        errors.append("the rounds must be lists of subrounds")
+    else:
+        for round_index, sub_rounds in enumerate(certificate["rounds"], start=1):
+            for sub_round_index, sub_round in enumerate(sub_rounds, start=1):
+                check_sub_round("subround %i.%i" % (round_index, sub_round_index), sub_round)
+    check_sub_round("final", certificate["final"])
+    if len(errors) == 0 and certificate["final"]["multiplicity"] != 1:
+        errors.append("final: the final subround must contain exactly one job")
+    return errors
+
+
+def verify_certificate(certificate: dict) -> [str]:
+    """
+    checks every witness schedule with integers on the common denominator of all job sizes: the witness has to
+    contain exactly the jobs released so far on the right number of machines, and c times its makespan must not
+    exceed the load an algorithm gets by scheduling the first jobs of all rounds and the jobs of the current subround
+    as in cost_on_different_machines
+    :param certificate: certificate as created by create_certificate, its structure is checked first
+    :returns:           a description of every violation, an empty list if the certificate is valid
+    """
+    errors = check_structure(certificate)
+    if len(errors) > 0:
+        return errors
+    m, c, final_m = certificate["m"], Fraction(certificate["c"]), certificate["final_m"]
+    sizes = [Fraction(size) for size in certificate["sizes"]]
+    denominator = lcm(*[size.denominator for size in sizes])
+    numerators = [size.numerator * (denominator // size.denominator) for size in sizes]
+
+    def check(name: str, sub_round: dict, expected_counts: {int: int}, machines: int, bound: int):
+        """
+        :param expected_counts: number of jobs of each size id that the witness has to contain
+        :param machines:        number of machines of the witness
+        :param bound:           load of the algorithm as integer on the common denominator
+        """
+        witness_counts, witness_machines, makespan = {}, 0, 0
+        for multiplicity, composition in sub_round["schedule"]:
+            witness_machines += multiplicity
+            makespan = max(makespan, sum(count * numerators[size_id] for size_id, count in composition))
+            for size_id, count in composition:
+                witness_counts[size_id] = witness_counts.get(size_id, 0) + multiplicity * count
+        if witness_machines != machines:
+            errors.append("%s: the witness has %i instead of %i machines" % (name, witness_machines, machines))
+        if {size_id: count for size_id, count in witness_counts.items() if count > 0} != expected_counts:
+            errors.append("%s: the witness does not contain exactly the jobs released so far" % name)
+        if c.numerator * makespan > c.denominator * bound:
+            errors.append("%s: c * %s exceeds %s" % (name, str(Fraction(makespan, denominator)),
+                                                     str(Fraction(bound, denominator))))
+        if Fraction(sub_round["cutoff"]) != Fraction(bound, denominator) / c:
+            errors.append("%s: the cutoff value does not match the sequence" % name)
+
+    counts = {}
+    first_jobs = 0
+    for round_index, sub_rounds in enumerate(certificate["rounds"], start=1):
+        if sum(sub_round["multiplicity"] for sub_round in sub_rounds) != m:
+            errors.append("round %i: the round does not contain m jobs" % round_index)
+        for sub_round_index, sub_round in enumerate(sub_rounds, start=1):
+            size_id = sub_round["size"]
+            counts[size_id] = counts.get(size_id, 0) + sub_round["multiplicity"]
+            if sub_round_index == 1:
+                # the first job of the round is counted twice if two jobs of the first subround share a machine
+                first_jobs += numerators[size_id]
+            check("subround %i.%i" % (round_index, sub_round_index), sub_round, counts, m,
+                  first_jobs + numerators[size_id])
+
+    # with final_m machines every round is repeated final_m / m times before the final job
+    final = certificate["final"]
+    if final_m % m != 0:
+        errors.append("final: %i machines are not a multiple of m" % final_m)
+    final_counts = {size_id: count * (final_m // m) for size_id, count in counts.items()}
+    final_counts[final["size"]] = final_counts.get(final["size"], 0) + 1
+    check("final", final, final_counts, final_m, first_jobs + numerators[final["size"]])
+    return errors
+
+
+if __name__ == '__main__':
+    # verifies the given certificates without CP-SAT, the exit code is 1 if any certificate is invalid
+    valid = True
+    for file_name in sys.argv[1:]:
+        start = time.time()
+        try:
+            errors = verify_certificate(read_certificate(file_name))
+        except (OSError, ValueError) as e:
+            errors = ["the certificate could not be read: " + str(e)]
+        for error in errors:
+            print("%s: %s" % (file_name, error))
+        print("%s: %s in %.3f ms" % (file_name, "invalid" if len(errors) > 0 else "valid",
+                                     (time.time() - start) * 1000))
+        valid = valid and len(errors) == 0
+    exit(0 if valid else 1)
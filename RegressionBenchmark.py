@@ -0,0 +1,218 @@
+import getopt
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from BatchVerifier import collect_input_files, parse_input_file, verify_sequence
+from SolveTrace import read_trace
+
+# number of input files in the quick mode, they are spread evenly over the sorted corpus
+QUICK_FILES = 3
+
+# changes of the time below this many seconds are measurement noise and never a regression
+MIN_TIME_DIFFERENCE = 0.05
+
+
+def select_quick_files(files: [str], count=QUICK_FILES) -> [str]:
+    """
+    :returns:   count files spread evenly over the given files, always the same ones for the same corpus
+    """
+    if len(files) <= count:
+        return files
+    return [files[i * len(files) // count] for i in range(count)]
+
+
+def get_sub_round_labels(file_name: str) -> [str]:
+    """
+    :returns:   the label 'round.subround' of every subround of the input file and 'final' for the final subround
+    """
+    m, _, sub_rounds, _ = parse_input_file(file_name)
+    labels = []
+    number_of_jobs, sub_round_index = 0, 0
+    for _, multiplicity in sub_rounds:
+        sub_round_index = 1 if number_of_jobs % m == 0 else sub_round_index + 1
+        labels.append("%i.%i" % (number_of_jobs // m + 1, sub_round_index))
+        number_of_jobs += multiplicity
+    return labels + ["final"]
+
+
+def measure_sequence(file_name: str, timeout: int, greedy_ratio: float, final_greedy_ratio: float) -> dict:
+    """
+    verifies the sequence of the input file with a trace and splits the solves of the trace into the subrounds,
+    the solves for the upscaling belong to the final subround. It is run in a fresh process so that the peak
+    memory, which includes the memory of CP-SAT, belongs to this sequence only
+    :returns:   the result, the wall time, the number of solves and the peak memory in MiB of the sequence and the
+                time, the number of solves and the deciding stage of each subround
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        trace_file = os.path.join(directory, "trace.jsonl")
+        result = verify_sequence(file_name, timeout, greedy_ratio, final_greedy_ratio, trace_file=trace_file)
+        records = read_trace(trace_file) if os.path.exists(trace_file) else []
+
+    sub_rounds = []
+    labels = get_sub_round_labels(file_name)
+    # the upscaling solves are recorded while the final solve is running, i.e. before the record of the final solve
+    upscaling = []
+    for record in records:
+        if record["caller"] == "upscaling":
+            upscaling.append(record)
+            continue
+        sub_rounds.append({"sub_round": labels[min(len(sub_rounds), len(labels) - 1)], "jobs": record["jobs"],
+                           "solves": 1 + len(upscaling), "stage": record.get("stage"),
+                           "time": record["time"]})
+        upscaling = []
+
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # the peak is given in bytes on macOS and in KiB elsewhere
+    peak_memory /= 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {"passed": result["passed"], "failing": result["failing"], "time": result["time"],
+            "solves": sum(sub_round["solves"] for sub_round in sub_rounds), "peak_memory": peak_memory,
+            "sub_rounds": sub_rounds}
+
+
+def run_benchmark(files: [str], timeout: int, greedy_ratio: float, final_greedy_ratio: float,
+                  processes: int = 1) -> {str: dict}:
+    """
+    measures every sequence in its own process, one process at a time by default so that the sequences do not
+    compete for the CPUs
+    :returns:   the measurement of each file
+    """
+    sequences = {}
+    # every file gets an executor with a fresh process, max_tasks_per_child requires Python 3.11, and up to
+    # processes files are measured at the same time
+    for start in range(0, len(files), processes):
+        executors = {file_name: ProcessPoolExecutor(max_workers=1) for file_name in files[start:start + processes]}
+        futures = {file_name: executor.submit(measure_sequence, file_name, timeout, greedy_ratio, final_greedy_ratio)
+                   for file_name, executor in executors.items()}
+        for file_name, future in futures.items():
+            sequences[file_name] = future.result()
+            executors[file_name].shutdown()
+    return sequences
+
+
+def is_regression(baseline_value: float, value: float, threshold: float, min_difference=0.0) -> bool:
+    """
+    :returns:   True if the value exceeds the baseline by more than the relative threshold and min_difference
+    """
+    return value > baseline_value * (1 + threshold) and value - baseline_value > min_difference
+
+
+def compare(baseline: dict, sequences: {str: dict}, threshold: float) -> [str]:
+    """
+    compares the measurements with a baseline, only files and subrounds contained in both are compared
+    :param baseline:    a baseline written by this script
+    :param sequences:   the current measurement of each file
+    :param threshold:   relative increase of the time, the number of solves or the peak memory that is a regression
+    :returns:           a description of every regression
+    """
+    regressions = []
+    print("%-28s  %12s  %12s  %8s  %8s  %8s" % ("file", "baseline [s]", "time [s]", "change", "solves",
+                                                 "memory"))
+    for file_name, sequence in sequences.items():
+        old = baseline["sequences"].get(file_name)
+        if old is None:
+            print("%-28s  %12s  %12.3f" % (file_name, "-", sequence["time"]))
+            continue
+        print("%-28s  %12.3f  %12.3f  %+7.1f%%  %+8i  %+7.1f%%" % (
+            file_name, old["time"], sequence["time"], 100 * (sequence["time"] / max(old["time"], 1e-9) - 1),
+            sequence["solves"] - old["solves"], 100 * (sequence["peak_memory"] / old["peak_memory"] - 1)))
+        if old["passed"] and not sequence["passed"]:
+            regressions.append("%s is no longer verified, failing subround %s" % (file_name, sequence["failing"]))
+        if is_regression(old["time"], sequence["time"], threshold, MIN_TIME_DIFFERENCE):
+            regressions.append("%s takes %.3f s instead of %.3f s" % (file_name, sequence["time"], old["time"]))
+        if is_regression(old["solves"], sequence["solves"], threshold):
+            regressions.append("%s needs %i solves instead of %i" % (file_name, sequence["solves"], old["solves"]))
+        if is_regression(old["peak_memory"], sequence["peak_memory"], threshold):
+            regressions.append("%s needs %.1f MiB instead of %.1f MiB" % (file_name, sequence["peak_memory"],
+                                                                         old["peak_memory"]))
+
+        old_sub_rounds = {sub_round["sub_round"]: sub_round for sub_round in old["sub_rounds"]}
+        for sub_round in sequence["sub_rounds"]:
+            old_sub_round = old_sub_rounds.get(sub_round["sub_round"])
+            if old_sub_round is not None and is_regression(old_sub_round["time"], sub_round["time"], threshold,
+                                                           MIN_TIME_DIFFERENCE):
+                regressions.append("%s subround %s takes %.3f s instead of %.3f s (stage %s instead of %s)" % (
+                    file_name, sub_round["sub_round"], sub_round["time"], old_sub_round["time"], sub_round["stage"],
+                    old_sub_round["stage"]))
+    return regressions
+
+
+if __name__ == '__main__':
+    # default values for command line options
+    pattern = "Inputs/"
+    quick = False
+    timeout = 40
+    greedy_ratio = 0.01
+    final_greedy_ratio = 0.2
+    processes = 1
+    threshold = 0.2
+    baseline_file = None
+    output = None
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "i:t:g:f:p:b:o:",
+                                   ["input=", "quick", "timeout=", "greedy_ratio=", "final_greedy_ratio=",
+                                    "processes=", "baseline=", "output=", "threshold="])
+        for opt, arg in opts:
+            if opt in ("-i", "--input"):
+                pattern = arg
+            elif opt == "--quick":
+                quick = True
+            elif opt in ("-t", "--timeout"):
+                timeout = int(arg)
+            elif opt in ("-g", "--greedy_ratio"):
+                greedy_ratio = float(arg)
+            elif opt in ("-f", "--final_greedy_ratio"):
+                final_greedy_ratio = float(arg)
+            elif opt in ("-p", "--processes"):
+                processes = int(arg)
+            elif opt in ("-b", "--baseline"):
+                baseline_file = arg
+            elif opt in ("-o", "--output"):
+                output = arg
+            elif opt == "--threshold":
+                threshold = float(arg)
+    except (getopt.GetoptError, ValueError) as e:
+        print("Command line arguments could not be parsed: " + str(e))
+        exit(1)
+
+    files = collect_input_files(pattern)
+    if quick:
+        files = select_quick_files(files)
+    if len(files) == 0:
+        print("No input files match " + pattern)
+        exit(1)
+    baseline = None
+    if baseline_file is not None:
+        try:
+            with open(baseline_file) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print("The baseline could not be read: " + str(e))
+            exit(1)
+
+    print("%i sequences in %s mode" % (len(files), "quick" if quick else "full"))
+    sequences = run_benchmark(files, timeout, greedy_ratio, final_greedy_ratio, processes)
+    print("%-28s  %-6s  %10s  %8s  %12s" % ("file", "result", "time [s]", "solves", "memory [MiB]"))
+    for file_name, sequence in sequences.items():
+        print("%-28s  %-6s  %10.3f  %8i  %12.1f" % (file_name, "pass" if sequence["passed"] else "FAIL",
+                                                    sequence["time"], sequence["solves"], sequence["peak_memory"]))
+
+    # the baseline is a single document that is replaced, e.g. after an intended change of the performance
+    if output is not None:
+        record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "mode": "quick" if quick else "full",
+                  "timeout": timeout, "greedy_ratio": greedy_ratio, "final_greedy_ratio": final_greedy_ratio,
+                  "sequences": sequences}
+        with open(output, "w") as f:
+            json.dump(record, f, indent=1)
+
+    if baseline is not None:
+        regressions = compare(baseline, sequences, threshold)
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+        print("%i regressions beyond %.0f%% compared to the baseline of %s" % (len(regressions), 100 * threshold,
+                                                                               baseline["time"]))
+        exit(1 if len(regressions) > 0 else 0)
@@ -1,23 +1,39 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from fractions import Fraction
 
+import matplotlib
+# the figures are only saved, so the non-interactive backend is used in every process
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import numpy as np
 
+# with more machines, machines with the same jobs are drawn as one bar labelled with their number
+AGGREGATE_ABOVE = 64
+
+# key of the PNG text chunk holding the hash of the figure content
+HASH_KEY = "ScheduleHash"
+
+# figures that are rendered by render_queued
+queued_figures = []
+
 
 def plot_stacked_bar(
         data: [[Fraction]],
         cutoff_value: Fraction,
         m: int,
         map_size_to_round: {Fraction: int},
-        final=False
+        final=False,
+        labels: [str] = None
 ):
     """
     heavily inspired by https://stackoverflow.com/a/50205834
     :param data:                    layers of the optimal schedule
     :param cutoff_value:            maximum allowed makespan
-    :param m:                       number of machines
+    :param m:                       number of bars
     :param map_size_to_round:       maps job sizes to the round they belong
     :param final:                   indicates if it is the final round
+    :param labels:                  label of each bar, None hides the labels
     """
     ind = list(range(m))
     axes = []
@@ -31,7 +47,8 @@ def plot_stacked_bar(
 
     # construct stacked bar chart
     for row_data in data:
-        color = [plt.cm.Set1(num_rounds - map_size_to_round[job]) for job in row_data]
+        # the final job does not need to occur in a previous round, it is colored black anyway
+        color = [plt.cm.Set1(num_rounds - map_size_to_round.get(job, 0)) for job in row_data]
         if final:
             color[0] = 'black'
         axes.append(plt.bar(ind, row_data,
@@ -48,26 +65,118 @@ def plot_stacked_bar(
         plt.hlines(cutoff_value, -1, m)
         plt.text(1, cutoff_value + cutoff_value / 10, "y = " + str(float(cutoff_value)), ha="center", va="center")
 
-    plt.gca().axes.xaxis.set_ticklabels([])
+    if labels is None:
+        plt.gca().axes.xaxis.set_ticklabels([])
+    else:
+        plt.xticks(ind, labels)
 
 
 def plot_schedule_for_subround(sub_round, map_size_to_round, final):
     """
-    wrapper for plot_schedule
+    queues the figure of a subround, it is drawn by render_queued
     :param sub_round:               subround to plot
     :param map_size_to_round:       maps job sizes to the rounds they belong
     :param final:                   indicates if the subround is the final round
     """
-    plot_schedule(sub_round.schedule, sub_round.name, sub_round.m, sub_round.cutoff_value, map_size_to_round, final)
+    queue_schedule(sub_round.schedule, sub_round.name, sub_round.m, sub_round.cutoff_value, map_size_to_round, final)
 
 
-def plot_schedule(
+def aggregate_machines(schedule: [[Fraction]]) -> ([[Fraction]], [str]):
+    """
+    :returns:   one machine of each machine type in the order of their first occurrence and the number of machines
+                of each type as labels
+    """
+    count_per_machine = {}
+    for machine in schedule:
+        count_per_machine[tuple(machine)] = count_per_machine.get(tuple(machine), 0) + 1
+    return [list(machine) for machine in count_per_machine.keys()], \
+           ["%i x" % count for count in count_per_machine.values()]
+
+
+def queue_schedule(
         schedule: [[Fraction]],
         figure_name: str,
         m: int,
         cutoff_value: Fraction = None,
         map_size_to_round=None,
         final=False
+):
+    """
+    queues a figure with the arguments of plot_schedule, for many machines the machine types are drawn instead
+    """
+    labels = None
+    if m > AGGREGATE_ABOVE:
+        schedule, labels = aggregate_machines(schedule)
+        m = len(schedule)
+    queued_figures.append((schedule, figure_name, m, cutoff_value, map_size_to_round, final, labels))
+
+
+def get_figure_hash(figure) -> str:
+    """
+    :returns:   a hash of everything that is drawn, the name of the figure is not part of it
+    """
+    schedule, _, m, cutoff_value, map_size_to_round, final, labels = figure
+    content = repr((schedule, m, cutoff_value, sorted((map_size_to_round or {}).items()), final, labels))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def read_png_text(file_name: str) -> {str: str}:
+    """
+    :returns:   the text chunks in front of the image data of a PNG file, an empty dictionary if it does not exist
+    """
+    result = {}
+    try:
+        with open(file_name, "rb") as f:
+            if f.read(8) != b"\x89PNG\r\n\x1a\n":
+                return result
+            while True:
+                header = f.read(8)
+                if len(header) < 8 or header[4:] in (b"IDAT", b"IEND"):
+                    break
+                data = f.read(int.from_bytes(header[:4], "big"))
+                # skip the checksum
+                f.read(4)
+                if header[4:] == b"tEXt":
+                    key, _, value = data.partition(b"\0")
+                    result[key.decode("latin-1")] = value.decode("latin-1")
+    except OSError:
+        pass
+    return result
+
+
+def render_figure(figure):
+    schedule, figure_name, m, cutoff_value, map_size_to_round, final, labels = figure
+    plot_schedule(schedule, figure_name, m, cutoff_value, map_size_to_round, final, labels, get_figure_hash(figure))
+
+
+def render_queued(processes: int = None) -> (int, int):
+    """
+    draws all queued figures whose PNG file does not already show the same content, in a process pool
+    :param processes:   number of worker processes, defaults to the number of CPUs, 1 draws in this process
+    :returns:           the number of drawn and skipped figures
+    """
+    figures = [figure for figure in queued_figures
+               if read_png_text(figure[1] + ".png").get(HASH_KEY) != get_figure_hash(figure)]
+    skipped = len(queued_figures) - len(figures)
+    queued_figures.clear()
+    if processes == 1 or len(figures) <= 1:
+        for figure in figures:
+            render_figure(figure)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            list(executor.map(render_figure, figures))
+    return len(figures), skipped
+
+
+def plot_schedule(
+        schedule: [[Fraction]],
+        figure_name: str,
+        m: int,
+        cutoff_value: Fraction = None,
+        map_size_to_round=None,
+        final=False,
+        labels: [str] = None,
+        figure_hash: str = None
 ):
     # compute number of bar chars that need to be stacked
     max_number_of_jobs_on_machine = 0
@@ -84,6 +193,6 @@ def plot_schedule(
                 layers[i].append(0.0)
 
     plt.figure(figsize=(20, 5))
-    plot_stacked_bar(layers, cutoff_value, m, map_size_to_round, final=final)
-    plt.savefig(figure_name + '.png')
+    plot_stacked_bar(layers, cutoff_value, m, map_size_to_round, final=final, labels=labels)
+    plt.savefig(figure_name + '.png', metadata=None if figure_hash is None else {HASH_KEY: figure_hash})
     plt.close()
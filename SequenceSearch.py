@@ -0,0 +1,182 @@
+import math
+import time
+from fractions import Fraction
+
+from BinPackingSolver import BinPackingSolver
+from JobMultiset import JobMultiset
+from ParallelSearch import ProbeRunner
+from Round import Round
+
+
+class SearchState:
+
+    def __init__(self, rounds: [Round], jobs: JobMultiset):
+        """
+        a partial sequence of completed rounds
+        :param rounds:  completed rounds
+        :param jobs:    all jobs of the completed rounds
+        """
+        self.rounds = rounds
+        self.jobs = jobs
+        self.final_sub_round = None
+        self.score = None
+
+    def is_closed(self) -> bool:
+        return self.final_sub_round is not None
+
+    def get_rounds(self) -> [Round]:
+        """
+        :returns:   the rounds including a last round with the final subround, ready to be exported
+        """
+        rounds = list(self.rounds)
+        if self.is_closed():
+            final_round = Round(len(rounds) + 1, self.final_sub_round.m)
+            final_round.add_sub_round(self.final_sub_round)
+            rounds.append(final_round)
+        for r in rounds:
+            r.initialize_identifiers(len(rounds))
+        return rounds
+
+
+class SequenceSearch:
+
+    def __init__(
+            self,
+            solver: BinPackingSolver,
+            greedy_ratio: float,
+            final_greedy_ratio: float,
+            final_jobs: [Fraction],
+            beam_width=3,
+            branching=4,
+            workers=1,
+            time_budget=3600,
+            max_rounds=10,
+            precision=3,
+            initial_job_size=Fraction(1, 100),
+            max_growth=8
+    ):
+        """
+        searches the first job sizes of the rounds with a beam search until a final job closes the sequence
+        :param solver:              solver used to complete the rounds, it should use a single worker if the
+                                    search uses several workers
+        :param greedy_ratio:        the ratio of jobs which should be scheduled greedily in a round
+        :param final_greedy_ratio:  the ratio of jobs which should be scheduled greedily in the final subround
+        :param final_jobs:          sizes that are tried as the final job after every round
+        :param beam_width:          number of partial sequences that are kept after each round
+        :param branching:           number of first job sizes that are tried for each partial sequence
+        :param workers:             number of rounds that are completed at the same time in separate processes
+        :param time_budget:         time in seconds after which the best partial sequence is returned
+        :param max_rounds:          maximum number of rounds before the final job
+        :param precision:           number of decimal places of the job sizes
+        :param initial_job_size:    size of the jobs in the first round
+        :param max_growth:          largest factor between the last job and the first job of the next round
+        """
+        self.solver = solver
+        self.greedy_ratio = greedy_ratio
+        self.final_greedy_ratio = final_greedy_ratio
+        self.final_jobs = sorted(final_jobs)
+        self.beam_width = beam_width
+        self.branching = branching
+        self.workers = workers
+        self.time_budget = time_budget
+        self.max_rounds = max_rounds
+        self.precision = precision
+        self.initial_job_size = initial_job_size
+        self.max_growth = max_growth
+
+    def get_candidates(self, state: SearchState) -> [Fraction]:
+        """
+        :returns:   the first job sizes that are tried for the next round, evenly spaced between the last job and
+                    the largest final job on the grid given by the precision
+        """
+        if len(state.jobs) == 0:
+            return [self.initial_job_size]
+        resolution = 10 ** self.precision
+        lower = math.ceil(state.jobs.last() * resolution)
+        upper = math.floor(min(state.jobs.last() * self.max_growth, self.final_jobs[-1]) * resolution)
+        if upper <= lower:
+            return [Fraction(lower, resolution)]
+        values = [lower + (upper - lower) * (i + 1) // self.branching for i in range(self.branching)]
+        return [Fraction(value, resolution) for value in sorted(set(values))]
+
+    def get_score(self, state: SearchState) -> Fraction:
+        """
+        the sequence can only be closed if the cutoff value of the final job is at least the average load, the
+        partial sequences with the largest difference are preferred
+        """
+        final_job = self.final_jobs[-1]
+        cutoff_value = (self.solver.get_base_cutoff_value(state.jobs) + final_job) / self.solver.c
+        return cutoff_value - (state.jobs.get_total() + final_job) / self.solver.m
+
+    def close(self, jobs: JobMultiset):
+        """
+        tries to close the sequence with one of the final jobs
+        :param jobs:    jobs of the completed rounds
+        :returns:       the final subround, None if no final job can be scheduled
+        """
+        for final_job in self.final_jobs:
+            if final_job < jobs.last():
+                continue
+            final_jobs = jobs.with_jobs(final_job)
+            cutoff_value = self.solver.get_base_cutoff_value(final_jobs) / self.solver.c
+            sub_round = self.solver.solve(final_jobs, cutoff_value, final_job, 1, True, self.final_greedy_ratio,
+                                          caller="final")
+            if sub_round is not None:
+                return sub_round
+        return None
+
+    def expand(self, state: SearchState, job_size: Fraction):
+        """
+        completes the next round with the given first job size and tests whether the sequence can be closed
+        :returns:   the extended state, None if the round could not be completed
+        """
+        jobs = state.jobs.copy()
+        next_round = self.solver.complete_round(jobs, len(state.rounds) + 1, job_size, self.greedy_ratio,
+                                                self.precision)
+        if next_round is None:
+            return None
+        result = SearchState(state.rounds + [next_round], jobs)
+        result.final_sub_round = self.close(jobs)
+        result.score = self.get_score(result)
+        return result
+
+    def search(self) -> SearchState:
+        """
+        :returns:   a closed sequence if one was found, otherwise the best partial sequence (None if not even the
+                    first round could be completed)
+        """
+        deadline = time.monotonic() + self.time_budget
+        beam = [SearchState([], JobMultiset(self.solver.m))]
+        best = None
+        for _ in range(self.max_rounds):
+            children = []
+            with ProbeRunner(self.workers) as runner:
+                for i, state in enumerate(beam):
+                    for job_size in self.get_candidates(state):
+                        runner.submit((i, job_size), self.expand, state, job_size)
+                while runner.has_probes():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    result = runner.next_result(remaining)
+                    if result is None:
+                        break
+                    (i, job_size), child = result
+                    if child is None:
+                        print("Round %i failed with a first job of size %f" % (len(beam[i].rounds) + 1, job_size))
+                        continue
+                    print("Round %i completed with a first job of size %f, score %f" %
+                          (len(child.rounds), job_size, child.score))
+                    if child.is_closed():
+                        return child
+                    children.append(child)
+
+            if len(children) == 0:
+                break
+            children.sort(key=lambda child: child.score, reverse=True)
+            beam = children[:self.beam_width]
+            best = beam[0]
+            if time.monotonic() >= deadline:
+                print("Time budget exhausted")
+                break
+        return best
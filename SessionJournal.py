@@ -0,0 +1,128 @@
+import json
+import os
+from fractions import Fraction
+
+from JobMultiset import JobMultiset
+from Round import Round
+from SubRound import SubRound
+
+
+class SessionJournal:
+
+    def __init__(self, file_name: str):
+        """
+        append-only journal of a session, every record is one JSON line that is flushed to disk immediately so that
+        the accepted subrounds survive a crash
+        :param file_name:   path of the journal, an existing journal is continued
+        """
+        self.file_name = file_name
+        self.file = open(file_name, "a+")
+        # a line that was interrupted by a crash is terminated so that it does not merge with the next record
+        if self.file.tell() > 0:
+            self.file.seek(self.file.tell() - 1)
+            if self.file.read(1) != "\n":
+                self.file.write("\n")
+        # probes in forked processes must not write to the journal of their parent
+        self.pid = os.getpid()
+
+    def write(self, record: dict):
+        if os.getpid() != self.pid:
+            return
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def record_start(self, m: int, c: Fraction):
+        self.write({"type": "start", "m": m, "c": str(c)})
+
+    def record_sub_round(self, round_id: int, sub_round: SubRound, final=False):
+        """
+        records an accepted subround with its schedule as (number of machines, {job size: count}) per machine type
+        """
+        schedule = [[multiplicity, [[str(job), count] for job, count in composition.items()]]
+                    for multiplicity, composition in sub_round.compact_schedule.get_compositions()]
+        self.write({"type": "sub_round", "round": round_id, "job_size": str(sub_round.job_size),
+                    "multiplicity": sub_round.multiplicity, "cutoff": str(sub_round.cutoff_value), "final": final,
+                    "schedule": schedule})
+
+    def record_round_search(self, round_id: int, job_size: Fraction):
+        """
+        records that a round is completed automatically starting with the given job size
+        """
+        self.write({"type": "round_search", "round": round_id, "job_size": str(job_size)})
+
+    def record_infeasible(self, number_of_jobs: int, job_size: Fraction, multiplicity: int, cutoff_value: Fraction):
+        """
+        records that the first number_of_jobs jobs of the session together with multiplicity jobs of size job_size
+        could not be scheduled within the cutoff value
+        """
+        self.write({"type": "infeasible", "jobs": number_of_jobs, "job_size": str(job_size),
+                    "multiplicity": multiplicity, "cutoff": str(cutoff_value)})
+
+    def close(self):
+        self.file.close()
+
+
+def read_journal(file_name: str) -> [dict]:
+    """
+    :returns:   the records of the journal, lines that were not written completely are skipped
+    """
+    records = []
+    with open(file_name) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                print("skipping incomplete journal line")
+    return records
+
+
+def decode_schedule(schedule: [[int, [[str, int]]]]) -> [[Fraction]]:
+    return [[Fraction(job) for job, count in composition for _ in range(count)]
+            for multiplicity, composition in schedule for _ in range(multiplicity)]
+
+
+def restore_session(records: [dict], solver):
+    """
+    rebuilds the rounds of a session from its journal without solving again, infeasible instances are added to the
+    feasibility cache of the solver
+    :param records:     records of the journal
+    :param solver:      solver with the number of machines and the competitive ratio of the session
+    :returns:           the rounds, all jobs, the first job size of an unfinished automatically completed round (None
+                        if there is none) and the final subround (None if the session was not finished)
+    """
+    m = solver.m
+    rounds = [Round(1, m)]
+    jobs = JobMultiset(m)
+    round_search = None
+    final_sub_round = None
+    infeasible = []
+    for record in records:
+        if record["type"] == "sub_round":
+            schedule = decode_schedule(record["schedule"])
+            job_size, multiplicity = Fraction(record["job_size"]), record["multiplicity"]
+            sub_round = solver.sub_round_from_schedule(schedule, Fraction(record["cutoff"]), job_size, multiplicity,
+                                                       record["final"])
+            if record["final"]:
+                final_sub_round = sub_round
+                continue
+            jobs.push(job_size, multiplicity)
+            rounds[-1].add_sub_round(sub_round)
+            if rounds[-1].get_number_of_jobs_left() == 0:
+                rounds.append(Round(len(rounds) + 1, m))
+        elif record["type"] == "round_search":
+            round_search = (record["round"], Fraction(record["job_size"]))
+        elif record["type"] == "infeasible":
+            infeasible.append(record)
+
+    # the automatically completed round is finished if a later round has been started
+    if round_search is not None and round_search[0] < rounds[-1].index:
+        round_search = None
+    if solver.cache is not None:
+        for record in infeasible:
+            if record["jobs"] <= len(jobs):
+                instance = jobs.copy()
+                instance.pop(len(jobs) - record["jobs"])
+                instance.push(Fraction(record["job_size"]), record["multiplicity"])
+                solver.cache.store(instance, Fraction(record["cutoff"]), None)
+    return rounds, jobs, None if round_search is None else round_search[1], final_sub_round
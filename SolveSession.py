@@ -0,0 +1,85 @@
+from fractions import Fraction
+
+
+class SolveSession:
+
+    def __init__(self, m: int):
+        """
+        keeps the last feasible assignment of consecutive solves which only differ by a few additional jobs
+        :param m:   number of machines
+        """
+        self.m = m
+        self.assignment = None
+        self.scale_factor = None
+        self.completed_directly = 0
+        self.hinted_solves = 0
+
+    def record(self, indicator_values: {(int, int), int}, scale_factor: Fraction):
+        """
+        stores a feasible assignment
+        :param indicator_values:    number of jobs of each scaled size on each machine
+        :param scale_factor:        factor by which the jobs have been scaled
+        """
+        self.assignment = dict(indicator_values)
+        self.scale_factor = scale_factor
+
+    def complete(
+            self,
+            multiplicity_per_job_size: {int: int},
+            scaled_cutoff_value: int,
+            scale_factor: Fraction
+    ) -> {(int, int), int}:
+        """
+        extends the stored assignment by placing each additional job on the least loaded machine it fits on
+        :param multiplicity_per_job_size:   number of jobs for each scaled job size
+        :param scaled_cutoff_value:         maximum load on each machine
+        :param scale_factor:                factor by which the jobs have been scaled
+        :returns:                           the extended assignment, None if it could not be extended
+        """
+        if self.assignment is None or scale_factor != self.scale_factor:
+            return None
+
+        previous_multiplicity = {}
+        loads = [0] * self.m
+        for (job, j), count in self.assignment.items():
+            previous_multiplicity[job] = previous_multiplicity.get(job, 0) + count
+            loads[j] += job * count
+
+        # the stored assignment can only be extended if no job has been removed
+        for job, mult in previous_multiplicity.items():
+            if mult > multiplicity_per_job_size.get(job, 0):
+                return None
+
+        result = {(job, j): self.assignment.get((job, j), 0)
+                  for job in multiplicity_per_job_size.keys() for j in range(self.m)}
+        if max(loads) > scaled_cutoff_value:
+            return None
+        for job in sorted(multiplicity_per_job_size.keys(), reverse=True):
+            for _ in range(multiplicity_per_job_size[job] - previous_multiplicity.get(job, 0)):
+                j = min(range(self.m), key=lambda machine: loads[machine])
+                if loads[j] + job > scaled_cutoff_value:
+                    return None
+                loads[j] += job
+                result[(job, j)] += 1
+        return result
+
+    def get_summary(self, solves: int) -> str:
+        """
+        :param solves:  number of solves of the session
+        :returns:       how many solves were completed without CP-SAT and how many CP-SAT solves started from a hint
+        """
+        return "%i of %i schedules were completed without CP-SAT, %i CP-SAT solves were hinted with the previous " \
+               "schedule" % (self.completed_directly, solves, self.hinted_solves)
+
+    def add_hints(self, model: "CpModel", indicator_variables: {(int, int), "IntVar"}, scale_factor: Fraction):
+        """
+        uses the stored assignment as solution hint for the next solve
+        :param model:               the CP-SAT model
+        :param indicator_variables: indicate the number of jobs of each scaled size on each machine
+        :param scale_factor:        factor by which the jobs have been scaled
+        """
+        if self.assignment is None or scale_factor != self.scale_factor:
+            return
+        for key, variable in indicator_variables.items():
+            model.AddHint(variable, self.assignment.get(key, 0))
+        self.hinted_solves += 1
@@ -0,0 +1,78 @@
+import json
+import sys
+
+
+class SolveTrace:
+
+    def __init__(self, file_name: str):
+        """
+        appends one JSON line per solve to a file, the lines are flushed immediately so that forked probe processes
+        can append their solves to the same file
+        :param file_name:   path of the trace
+        """
+        self.file = open(file_name, "a")
+
+    def record_solve(
+            self,
+            caller: str,
+            number_of_jobs: int,
+            m: int,
+            final: bool,
+            feasible: bool,
+            wall_time: float,
+            report: dict
+    ):
+        """
+        :param caller:          tag of the calling search
+        :param number_of_jobs:  number of jobs of the instance
+        :param m:               number of machines
+        :param final:           indicates whether the final subround was solved
+        :param feasible:        indicates whether a schedule was found
+        :param wall_time:       time of the solve in seconds
+        :param report:          the last report of the solver with the stage, the split into big and small jobs, the
+                                scaling and the statistics of CP-SAT if it was called
+        """
+        record = {"caller": caller, "jobs": number_of_jobs, "m": m, "final": final,
+                  "status": report.get("cp_status",
+                                       report.get("result", "feasible" if feasible else "infeasible").upper()),
+                  "feasible": feasible, "time": wall_time}
+        for key, value in report.items():
+            record[key] = str(value) if key == "scale_factor" else value
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(file_name: str, offset=0) -> [dict]:
+    """
+    :param offset:  position in the file from which on the records are read
+    """
+    with open(file_name) as f:
+        f.seek(offset)
+        return [json.loads(line) for line in f if line.strip() != ""]
+
+
+def get_summary(records: [dict]) -> str:
+    """
+    :returns:   a table with the number of solves and their total time by caller, by status, by result and by stage
+    """
+    lines = []
+    for key in ("caller", "status", "result", "stage"):
+        count_per_value, time_per_value = {}, {}
+        for record in records:
+            value = str(record.get(key))
+            count_per_value[value] = count_per_value.get(value, 0) + 1
+            time_per_value[value] = time_per_value.get(value, 0.0) + record["time"]
+        lines.append("%-20s  %8s  %10s" % (key, "solves", "time [s]"))
+        for value in sorted(time_per_value.keys(), key=lambda v: time_per_value[v], reverse=True):
+            lines.append("%-20s  %8i  %10.3f" % (value, count_per_value[value], time_per_value[value]))
+        lines.append("")
+    lines.append("%i solves in %.3f s" % (len(records), sum(record["time"] for record in records)))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    # prints the summary of the given trace files
+    print(get_summary([record for file_name in sys.argv[1:] for record in read_trace(file_name)]))
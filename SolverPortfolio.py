@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+
+from ParallelSearch import ProbeRunner
+
+# CP-SAT parameters of each preset, enum values are given by their name in cp_model
+PRESETS = {
+    "default": {},
+    # schedules are usually found quickly by restarts, the LP relaxation only slows them down
+    "feasibility": {"search_branching": "PORTFOLIO_WITH_QUICK_RESTART_SEARCH", "linearization_level": 0},
+    # the full LP relaxation proves that nearly full machines can not take all jobs
+    "infeasibility": {"linearization_level": 2, "symmetry_level": 4},
+}
+
+# statuses with which CP-SAT decided the instance
+DECIDED = ("OPTIMAL", "FEASIBLE", "INFEASIBLE")
+
+
+def parse_presets(text: str) -> [str]:
+    """
+    :param text:    comma separated names of presets
+    :returns:       the names of the presets, a ValueError is raised for an unknown preset
+    """
+    names = [name.strip() for name in text.split(",") if name.strip() != ""]
+    if len(names) == 0:
+        raise ValueError("no preset given")
+    for name in names:
+        if name not in PRESETS:
+            raise ValueError("unknown preset %s, known presets are %s" % (name, ", ".join(PRESETS.keys())))
+    return names
+
+
+def parse_presets_per_caller(text: str) -> {str: [str]}:
+    """
+    :param text:    entries of the form caller=preset,preset separated by semicolons,
+                    e.g. 'binary search=infeasibility;multiplicity search=feasibility'
+    :returns:       the presets of each caller
+    """
+    presets_per_caller = {}
+    for entry in text.split(";"):
+        if entry.strip() == "":
+            continue
+        caller, _, presets = entry.partition("=")
+        presets_per_caller[caller.strip()] = parse_presets(presets)
+    return presets_per_caller
+
+
+def solve_with_preset(model, variables: dict, timeout: float, preset: str, cp_workers: int = None) -> (dict, dict):
+    """
+    :param model:       CpModel to solve
+    :param variables:   variables whose values are returned, by key
+    :param timeout:     timeout for CP-SAT
+    :param preset:      name of the preset
+    :param cp_workers:  number of CP-SAT workers, None keeps the default of CP-SAT
+    :returns:           the value of each variable (None if no solution was found) and the statistics of the solve
+    """
+    from ortools.sat.python import cp_model
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = timeout
+    if cp_workers is not None:
+        solver.parameters.num_workers = cp_workers
+    for name, value in PRESETS[preset].items():
+        setattr(solver.parameters, name, getattr(cp_model, value) if isinstance(value, str) else value)
+    status = solver.Solve(model)
+    statistics = {"cp_status": solver.StatusName(status), "conflicts": solver.NumConflicts(),
+                  "branches": solver.NumBranches(), "cp_time": solver.WallTime(), "preset": preset}
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return {key: solver.Value(variable) for key, variable in variables.items()}, statistics
+    return None, statistics
+
+
+def solve_model(model, variables: dict, timeout: float, presets: [str], cp_workers: int = None) -> (dict, dict):
+    """
+    solves the model with the given presets, several presets race in separate processes and the first one that
+    decides the instance wins, the others are terminated
+    :param cp_workers:  number of CP-SAT workers of each preset, None divides the CPUs among the racing presets
+    :returns:           the value of each variable (None if no solution was found) and the statistics of the
+                        winning solve
+    """
+    # probe processes are daemons and can not start a race of their own
+    if len(presets) == 1 or multiprocessing.current_process().daemon:
+        return solve_with_preset(model, variables, timeout, presets[0], cp_workers)
+    if cp_workers is None:
+        cp_workers = max(1, (os.cpu_count() or 1) // len(presets))
+
+    values, statistics = None, None
+    with ProbeRunner(len(presets)) as runner:
+        for preset in presets:
+            runner.submit(preset, solve_with_preset, model, variables, timeout, preset, cp_workers)
+        while runner.has_probes():
+            _, result = runner.next_result()
+            if result is None:
+                continue
+            values, statistics = result
+            if statistics["cp_status"] in DECIDED:
+                break
+    if statistics is None:
+        # every preset failed, this proves nothing
+        statistics = {"cp_status": "UNKNOWN", "preset": "+".join(presets)}
+    return values, statistics
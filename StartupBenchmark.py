@@ -0,0 +1,73 @@
+import getopt
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# modules that must not be loaded before they are needed
+HEAVY_MODULES = ["ortools", "matplotlib", "numpy"]
+
+
+def measure(command: [str], repetitions: int) -> [float]:
+    """
+    :returns:   the wall time in seconds of each cold start of the command
+    """
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def get_loaded_heavy_modules(module: str) -> [str]:
+    """
+    :returns:   the heavy modules that are loaded by importing the module in a new interpreter
+    """
+    code = "import sys, %s; print(' '.join(m for m in %s if m in sys.modules))" % (module, repr(HEAVY_MODULES))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return output.split()
+
+
+if __name__ == '__main__':
+    # default values for command line options
+    repetitions = 5
+    input_file = "Inputs/Input1_852.txt"
+    output = None
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "r:i:o:", ["repetitions=", "input=", "output="])
+    except getopt.GetoptError:
+        print("Command line arguments could not be parsed")
+        exit(1)
+    for opt, arg in opts:
+        if opt in ("-r", "--repetitions"):
+            repetitions = int(arg)
+        elif opt in ("-i", "--input"):
+            input_file = arg
+        elif opt in ("-o", "--output"):
+            output = arg
+
+    commands = {
+        "python": [sys.executable, "-c", "pass"],
+        "import main": [sys.executable, "-c", "import main"],
+        "verify sequence": [sys.executable, "main.py", "-b", input_file, "-p", "1"],
+    }
+    record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "repetitions": repetitions}
+    print("%-16s  %10s  %10s" % ("command", "min [s]", "median [s]"))
+    for name, command in commands.items():
+        times = measure(command, repetitions)
+        record[name] = statistics.median(times)
+        print("%-16s  %10.3f  %10.3f" % (name, min(times), statistics.median(times)))
+
+    loaded = get_loaded_heavy_modules("main")
+    record["heavy modules"] = loaded
+    print("heavy modules loaded by importing main: " + (", ".join(loaded) if len(loaded) > 0 else "none"))
+    # the measurements are appended so that the startup time can be tracked over time
+    if output is not None:
+        with open(output, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    exit(1 if len(loaded) > 0 else 0)
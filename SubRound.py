@@ -1,56 +1,44 @@
 import string
 from fractions import Fraction
 
-from ortools.sat.python import cp_model
-from ortools.sat.python.cp_model import IntVar
 import re
 
-import SchedulePlotter
+import GreedyScheduler
+from CompactSchedule import CompactSchedule
+from IntegerGrid import IntegerGrid
 
 
 class SubRound:
 
     def extract_indicator_variables(
             self,
-            indicator_variables: {(int, int), IntVar},
+            indicator_variables: {(Fraction, int), int},
             scheduled_jobs: [Fraction],
-            solver: cp_model,
-            scale_factor: int,
             m: int
     ) -> [[Fraction]]:
         """
-        extracts the schedule from the indicator variables to a list of jobs for each machine
+        extracts the schedule from the values of the indicator variables to a list of jobs for each machine
         :param indicator_variables:     indicate the number of jobs of a specific size on each machine
         :param scheduled_jobs:          jobs for which indicator variables exist
-        :param solver:                  the CP-SAT solver
-        :param scale_factor:            factor by which the jobs have been scaled
         """
         result = [[] for _ in range(m)]
 
         # create assignment based on indicator variables
         for job in set(scheduled_jobs):
             for j in range(m):
-                for i in range(solver.Value(indicator_variables[(int(job * scale_factor), j)])):
+                for i in range(indicator_variables.get((job, j), 0)):
                     result[j].append(job)
         return result
 
     def schedule_greedily(self, small_jobs: [Fraction], schedule: [[Fraction]]):
         # try to schedule the remaining jobs greedily
-        self.jobs_left = []
-        for job in reversed(small_jobs):
-            schedule.sort(reverse=False, key=lambda machine: (sum(machine), machine))
-            if sum(schedule[0]) + job <= self.cutoff_value:
-                schedule[0].append(job)
-            else:
-                self.jobs_left.append(job)
+        self.jobs_left = GreedyScheduler.schedule_greedily(small_jobs, schedule, self.cutoff_value, self.grid)
 
     def set_schedule(
             self,
-            indicator_variables: {(int, int), IntVar},
+            indicator_variables: {(Fraction, int), int},
             scheduled_jobs: [Fraction],
-            small_jobs: [Fraction],
-            solver: cp_model,
-            scale_factor: int
+            small_jobs: [Fraction]
     ):
         """
         sets the schedule attribute, if it is not possible to greedily schedule the small jobs with
@@ -59,15 +47,14 @@ class SubRound:
         :param indicator_variables: indicate how many jobs of each type are scheduled on each machine
         :param scheduled_jobs:      jobs that can be assigned with the indicator variables
         :param small_jobs:          jobs that need to be assigned greedily
-        :param solver:              contains the values for the indicator variables
-        :param scale_factor:        needed to map job sizes to indicator variables
         """
 
-        self.schedule = self.extract_indicator_variables(indicator_variables, scheduled_jobs, solver, scale_factor, self.m)
-        self.schedule_greedily(small_jobs, self.schedule)
+        schedule = self.extract_indicator_variables(indicator_variables, scheduled_jobs, self.m)
+        self.schedule_greedily(small_jobs, schedule)
 
         # sort the schedule for visual uniformity
-        self.schedule.sort(reverse=True, key=lambda machine: (sum(machine), machine))
+        self.grid.sort_by_load(schedule, reverse=True)
+        self.schedule = schedule
 
         # check if greedy scheduling was successfull
         if len(self.jobs_left) > 0:
@@ -75,20 +62,17 @@ class SubRound:
 
     def __init__(
             self,
-            indicator_variables: {(int, int), IntVar},
-            solver: cp_model,
+            indicator_variables: {(Fraction, int), int},
             jobs: [Fraction],
             small_jobs: [Fraction],
             cutoff_value: Fraction,
             job_size: Fraction,
             multiplicity: int,
             m: int,
-            c: Fraction,
-            scale_factor: int
+            c: Fraction
     ):
         """
         :param indicator_variables:     indicate the number of jobs of each size on each machine
-        :param solver:                  the CP-SAT solver with the values of the indicator variables
         :param jobs:                    jobs that have been scheduled
         :param small_jobs:              jobs that still have to be scheduled greedily
         :param cutoff_value:            maximum allowed makespan
@@ -96,9 +80,8 @@ class SubRound:
         :param multiplicity:            number of jobs in the subround
         :param m:                       number of machines
         :param c:                       competitive ratio
-        :param scale_factor:            integer by which the jobs have been scaled for the integer variables
         """
-        self.schedule = None
+        self.compact_schedule = None
         self.jobs_left = None
         self.cutoff_value = cutoff_value
         self.job_size = job_size
@@ -107,7 +90,22 @@ class SubRound:
         self.c = c
         self.identifier = ""
         self.name = ""
-        self.set_schedule(indicator_variables, jobs, small_jobs, solver, scale_factor)
+        # the grid is only needed to compute the schedule
+        self.grid = IntegerGrid(c)
+        self.set_schedule(indicator_variables, jobs, small_jobs)
+        self.grid = None
+
+    @property
+    def schedule(self) -> ((Fraction, ...), ...):
+        """
+        jobs on each machine, created from the compact schedule on every access as tuples so that it can not be
+        changed in place, a new schedule has to be assigned
+        """
+        return None if self.compact_schedule is None else self.compact_schedule.to_tuples()
+
+    @schedule.setter
+    def schedule(self, schedule: [[Fraction]]):
+        self.compact_schedule = CompactSchedule(schedule)
 
     def __str__(self):
         return str(self.schedule)
@@ -127,13 +125,7 @@ class SubRound:
         """
         :return: a fraction representing the makespan of the schedule
         """
-        makespan = 0
-        for machine in self.schedule:
-            load_on_machine = 0
-            for element in machine:
-                load_on_machine += element
-            makespan = max(makespan, load_on_machine)
-        return makespan
+        return self.compact_schedule.get_makespan()
 
     def get_image(self, map_size_to_round, final=False):
         """
@@ -148,6 +140,8 @@ class SubRound:
                   str(float(self.get_makespan())) + "}\n"
         result += "\\end{figure}\n"
         result += "\\FloatBarrier\n"
+        # matplotlib is only loaded when a proof is exported
+        import SchedulePlotter
         SchedulePlotter.plot_schedule_for_subround(self, map_size_to_round, final)
         return result
 
@@ -189,22 +183,8 @@ class SubRound:
         result = "The assignment on the example schedule is as follows: \n"
         result += "\\begin{itemize}\n"
 
-        # count how many machines have the same schedule
-        multiplicity_per_schedule = {}
-        for machine in self.schedule:
-            if tuple(machine) in multiplicity_per_schedule:
-                multiplicity_per_schedule[tuple(machine)] += 1
-            else:
-                multiplicity_per_schedule[tuple(machine)] = 1
-
         # describe load for each type of machine
-        for machine, multiplicity_of_machine in multiplicity_per_schedule.items():
-            number_of_jobs_per_size = {}
-            for job in machine:
-                if job in number_of_jobs_per_size:
-                    number_of_jobs_per_size[job] += 1
-                else:
-                    number_of_jobs_per_size[job] = 1
+        for multiplicity_of_machine, number_of_jobs_per_size in self.compact_schedule.get_compositions():
             result += "\\item $\\frac{" + str(multiplicity_of_machine) + "}{" + str(self.m) + \
                       "}$m machines with a workload of "
             jobs = []
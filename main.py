@@ -1,9 +1,19 @@
+import atexit
 import getopt
+import os
 import sys
 
-from BinPackingSolver import BinPackingSolver
-import LaTexExporter
+import BatchVerifier
+from BinPackingSolver import BinPackingSolver, BACKENDS, MULTIPLICITY_SEARCHES
+import CompetitiveRatioSearch
+from ConfigurationLP import ConfigurationLP
+from JobMultiset import JobMultiset
+import ProofCertificate
 from Round import Round
+from SequenceSearch import SequenceSearch
+import SessionJournal
+import SolveTrace
+import SolverPortfolio
 from fractions import Fraction
 
 
@@ -16,24 +26,22 @@ def handle_next_command(job_size: Fraction):
         rounds.append(Round(len(rounds) + 1, m))
     else:
         # add subround to job list
-        for i in range(multiplicity):
-            jobs_so_far.append(job_size)
-        cutoff_value = 0
-        for i in range(0, len(jobs_so_far), m):
-            cutoff_value += jobs_so_far[i]
-        cutoff_value += job_size
-        cutoff_value = cutoff_value / c
+        jobs_so_far.push(job_size, multiplicity)
+        cutoff_value = (solver.get_base_cutoff_value(jobs_so_far) + job_size) / c
 
         print("Current maximum makespan allowed: " + str(float(cutoff_value)))
 
         sub_round = solver.solve(jobs_so_far, cutoff_value, job_size, multiplicity, False, greedy_ratio)
 
         if sub_round is None:
+            jobs_so_far.pop(multiplicity)
             print(
                 'The subround (%i, %f) could not be scheduled. Try with other values' % (multiplicity, float(job_size)))
         else:
             print('Subround successfully scheduled')
             rounds[len(rounds) - 1].add_sub_round(sub_round)
+            if solver.journal is not None:
+                solver.journal.record_sub_round(rounds[len(rounds) - 1].index, sub_round)
             if rounds[len(rounds) - 1].get_number_of_jobs_left() == 0:
                 rounds.append(Round(len(rounds) + 1, m))
 
@@ -44,25 +52,161 @@ def handle_finish():
         exit(1)
 
     job_size = Fraction(input('Enter the last job\n'))
-    jobs_so_far.append(job_size)
+    jobs_so_far.push(job_size)
 
-    cutoff_value = 0
-    for i in range(0, len(jobs_so_far), m):
-        cutoff_value += jobs_so_far[i]
-    cutoff_value = cutoff_value / c
+    cutoff_value = solver.get_base_cutoff_value(jobs_so_far) / c
 
     for round in rounds:
         for sub_round in round.sub_rounds:
             print(float(sub_round.job_size), sub_round.multiplicity)
 
     last_sub_round = solver.solve(jobs_so_far, cutoff_value, job_size, 1, True, final_greedy_ratio)
-    final_m = last_sub_round.m
-    if last_sub_round is not None:
-        rounds[len(rounds) - 1].add_sub_round(last_sub_round)
+    if last_sub_round is None:
+        print('The final job of size %f could not be scheduled' % float(job_size))
+        exit(1)
+    rounds[len(rounds) - 1].add_sub_round(last_sub_round)
+    if solver.journal is not None:
+        solver.journal.record_sub_round(rounds[len(rounds) - 1].index, last_sub_round, final=True)
+
+    export_rounds(last_sub_round.m)
+
+
+def export_rounds(final_m: int):
+    for round in rounds:
+        round.initialize_identifiers(len(rounds))
+    export_proof(rounds, m, final_m, c)
+
+
+def export_proof(proof_rounds: [Round], m: int, final_m: int, c: Fraction):
+    # the certificate is written first since it does not depend on matplotlib
+    ProofCertificate.write_certificate(ProofCertificate.create_certificate(proof_rounds, m, c), "test.json")
+    print("Certificate written to test.json")
+    if verify_only:
+        return
+    # the LaTeX export loads matplotlib, so it is imported on first use
+    import LaTexExporter
+    LaTexExporter.export(proof_rounds, "test.out", m, final_m, c)
+
+
+def create_solver(solver_m: int, solver_c: Fraction, solver_workers: int = None) -> BinPackingSolver:
+    """
+    :param solver_workers:  number of probe workers, None uses the one given on the command line
+    :returns:               a solver with the configuration of the command line, without a trace
+    """
+    configured_solver = BinPackingSolver(solver_m, solver_c, timeout, aggregate, cache_size, multiplicity_search,
+                                         workers if solver_workers is None else solver_workers, use_presolve,
+                                         max_coefficient, initial_timeout, global_budget)
+    configured_solver.backend = backend
+    configured_solver.presets = presets
+    configured_solver.presets_per_caller = presets_per_caller
+    configured_solver.cp_workers = cp_workers
+    configured_solver.symmetry_breaking = symmetry_breaking
+    configured_solver.max_upscaling_factor = max_upscaling_factor
+    configured_solver.lp_filter = ConfigurationLP() if lp_filter else None
+    return configured_solver
+
+
+def run_search(m: int, c: Fraction, cache=None):
+    # the rounds are completed in separate processes, so the solver itself uses a single worker
+    search_solver = create_solver(m, c, 1)
+    search_workers = workers
+    if cache is not None:
+        search_solver.cache = cache
+        # a shared cache is only filled by rounds that are completed in this process
+        search_workers = 1
+    if trace_file is not None:
+        search_solver.trace = SolveTrace.SolveTrace(trace_file)
+    search = SequenceSearch(search_solver, greedy_ratio, final_greedy_ratio, final_jobs, beam_width, branching,
+                            search_workers, time_budget, max_rounds)
+    return search.search()
+
+
+def handle_search():
+    state = run_search(m, c)
+    if state is None:
+        print("Not even the first round could be completed")
+        exit(1)
+
+    for round in state.rounds:
+        for sub_round in round.sub_rounds:
+            print(float(sub_round.job_size), sub_round.multiplicity)
+    if not state.is_closed():
+        print("No final job closes the best sequence found")
+        exit(1)
+    print("final job", float(state.final_sub_round.job_size))
+    export_proof(state.get_rounds(), m, state.final_sub_round.m, c)
+
+
+def handle_bisection():
+    lower, upper = [Fraction(value) for value in bisect_interval.split(",")]
+    if sequence_file is not None:
+        # the job sequence of the file is verified for every competitive ratio
+        m = BatchVerifier.parse_input_file(sequence_file)[0]
+        configuration = create_solver(m, Fraction(lower))
+
+        def verify(c_value, cache):
+            return BatchVerifier.verify_sequence(sequence_file, timeout, greedy_ratio, final_greedy_ratio, aggregate,
+                                                 c_value, cache, trace_file, configuration)
+    else:
+        # a new job sequence is searched for every competitive ratio
+        m = int(input('Enter the number of machines\n'))
+        if workers > 1 and cache_size > 0:
+            print("The rounds are completed one after another so that the competitive ratios share the cache")
+
+        def verify(c_value, cache):
+            state = run_search(m, c_value, cache)
+            if state is None or not state.is_closed():
+                return {"passed": False, "rounds": []}
+            return {"passed": True, "rounds": state.get_rounds()}
 
+    largest_c, result = CompetitiveRatioSearch.find_largest_competitive_ratio(lower, upper, verify, c_precision,
+                                                                              cache_size)
+    if largest_c is None:
+        print("No competitive ratio in [%s, %s] could be verified" % (str(float(lower)), str(float(upper))))
+        exit(1)
+    print("Largest verified competitive ratio: %s (%s)" % (str(float(largest_c)), str(largest_c)))
+    rounds = result["rounds"]
     for round in rounds:
         round.initialize_identifiers(len(rounds))
-    LaTexExporter.export(rounds, "test.out", m, final_m, c)
+    export_proof(rounds, m, rounds[-1].sub_rounds[-1].m, largest_c)
+
+
+def handle_resume():
+    """
+    rebuilds the rounds of the journal, finishes an automatically completed round that was interrupted and exports
+    the proof if the session had already been finished
+    """
+    restored_rounds, restored_jobs, round_search_job_size, final_sub_round = \
+        SessionJournal.restore_session(records, solver)
+    rounds[:] = restored_rounds
+    for job, count in restored_jobs.runs:
+        jobs_so_far.push(job, count)
+    print("Restored %i jobs" % len(jobs_so_far))
+    for round in rounds:
+        for sub_round in round.sub_rounds:
+            print(float(sub_round.job_size), sub_round.multiplicity)
+
+    if final_sub_round is not None:
+        print("The session was already finished")
+        rounds[len(rounds) - 1].add_sub_round(final_sub_round)
+        export_rounds(final_sub_round.m)
+        exit(0)
+
+    if round_search_job_size is not None:
+        print("Continuing the round with the first job size %f" % float(round_search_job_size))
+        if len(rounds[len(rounds) - 1].sub_rounds) == 0:
+            round = handle_round(round_search_job_size, len(rounds))
+        else:
+            round = solver.continue_round(jobs_so_far, rounds[len(rounds) - 1], greedy_ratio, 3)
+            if round is None:
+                print('Failed to complete round for a job size of %f' % float(round_search_job_size))
+                exit(1)
+        rounds[len(rounds) - 1] = round
+        rounds.append(Round(len(rounds) + 1, m))
+
+
+def print_trace_summary():
+    print(SolveTrace.get_summary(SolveTrace.read_trace(trace_file, trace_offset)))
 
 
 def handle_round(job_size, round_id):
@@ -82,9 +226,47 @@ if __name__ == '__main__':
     timeout = 40
     greedy_ratio = 0.01
     final_greedy_ratio = 0.2
+    batch_pattern = None
+    processes = None
+    aggregate = False
+    # the default depends on the mode, the runs of a bisection share a larger cache
+    cache_size = None
+    multiplicity_search = "linear"
+    workers = 1
+    use_presolve = True
+    max_coefficient = None
+    search_mode = False
+    beam_width = 3
+    branching = 4
+    time_budget = 3600
+    max_rounds = 10
+    final_jobs = [Fraction(1)]
+    bisect_interval = None
+    sequence_file = None
+    c_precision = 3
+    journal_file = None
+    resume_file = None
+    verify_only = False
+    trace_file = None
+    initial_timeout = None
+    global_budget = None
+    presets = ["default"]
+    presets_per_caller = {}
+    cp_workers = None
+    symmetry_breaking = False
+    backend = "auto"
+    max_upscaling_factor = 5
+    lp_filter = False
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "t:g:f:",
-                                   ["timeout=", "greedy_ratio=", "final_greedy_ratio="])
+        opts, args = getopt.getopt(sys.argv[1:], "t:w:g:f:b:p:as:",
+                                   ["timeout=", "workers=", "greedy_ratio=", "final_greedy_ratio=", "batch=",
+                                    "processes=", "aggregate", "cache_size=", "multiplicity_search=",
+                                    "no_presolve", "max_coefficient=", "search", "beam_width=", "branching=",
+                                    "time_budget=", "max_rounds=", "final_jobs=", "bisect=", "sequence=",
+                                    "c_precision=", "journal=", "resume=", "verify_only", "trace=",
+                                    "initial_timeout=", "global_budget=", "presets=", "caller_presets=",
+                                    "cp_workers=", "symmetry_breaking", "backend=",
+                                    "max_upscaling_factor=", "lp_filter"])
     except getopt.GetoptError:
         print("Command line arguments could not be parsed")
         exit(1)
@@ -93,19 +275,131 @@ if __name__ == '__main__':
     for opt, arg in opts:
         if opt in ("-t", "--timeout"):
             timeout = int(arg)
+        elif opt in ("-w", "--workers"):
+            workers = int(arg)
         elif opt in ("-g", "--greedy_ratio"):
             greedy_ratio = float(arg)
         elif opt in ("-f", "--final_greedy_ratio"):
             final_greedy_ratio = float(arg)
+        elif opt in ("-b", "--batch"):
+            batch_pattern = arg
+        elif opt in ("-p", "--processes"):
+            processes = int(arg)
+        elif opt in ("-a", "--aggregate"):
+            aggregate = True
+        elif opt == "--cache_size":
+            cache_size = int(arg)
+        elif opt in ("-s", "--multiplicity_search"):
+            multiplicity_search = arg
+            if multiplicity_search not in MULTIPLICITY_SEARCHES:
+                print("Command line arguments could not be parsed: unknown multiplicity search %s, known searches are "
+                      "%s" % (multiplicity_search, ", ".join(MULTIPLICITY_SEARCHES)))
+                exit(1)
+        elif opt == "--no_presolve":
+            use_presolve = False
+        elif opt == "--max_coefficient":
+            max_coefficient = int(arg)
+        elif opt == "--search":
+            search_mode = True
+        elif opt == "--beam_width":
+            beam_width = int(arg)
+        elif opt == "--branching":
+            branching = int(arg)
+        elif opt == "--time_budget":
+            time_budget = float(arg)
+        elif opt == "--max_rounds":
+            max_rounds = int(arg)
+        elif opt == "--final_jobs":
+            final_jobs = [Fraction(size) for size in arg.split(",")]
+        elif opt == "--bisect":
+            bisect_interval = arg
+        elif opt == "--sequence":
+            sequence_file = arg
+        elif opt == "--c_precision":
+            c_precision = int(arg)
+        elif opt == "--journal":
+            journal_file = arg
+        elif opt == "--resume":
+            resume_file = arg
+        elif opt == "--verify_only":
+            verify_only = True
+        elif opt == "--trace":
+            trace_file = arg
+        elif opt == "--initial_timeout":
+            initial_timeout = float(arg)
+        elif opt == "--global_budget":
+            global_budget = float(arg)
+        elif opt in ("--presets", "--caller_presets"):
+            try:
+                if opt == "--presets":
+                    presets = SolverPortfolio.parse_presets(arg)
+                else:
+                    presets_per_caller = SolverPortfolio.parse_presets_per_caller(arg)
+            except ValueError as e:
+                print(e)
+                exit(1)
+        elif opt == "--cp_workers":
+            cp_workers = int(arg)
+        elif opt == "--symmetry_breaking":
+            symmetry_breaking = True
+        elif opt == "--lp_filter":
+            lp_filter = True
+        elif opt == "--max_upscaling_factor":
+            max_upscaling_factor = int(arg)
+        elif opt == "--backend":
+            backend = arg
+            if backend not in BACKENDS:
+                print("unknown backend %s, known backends are %s" % (backend, ", ".join(BACKENDS)))
+                exit(1)
         else:
             print("unknown command line option: " + opt)
             exit(1)
 
-    m = int(input('Enter the number of machines\n'))
-    c = Fraction(input('Enter the competitive ratio\n'))
-    solver = BinPackingSolver(m, c, timeout)
-    jobs_so_far: [Fraction] = []
+    if cache_size is None:
+        cache_size = 4096 if bisect_interval is not None else 256
+
+    if trace_file is not None:
+        # the summary only covers the solves of this run, the trace may be continued
+        trace_offset = os.path.getsize(trace_file) if os.path.exists(trace_file) else 0
+        atexit.register(print_trace_summary)
+
+    if batch_pattern is not None:
+        # m and c of each sequence are taken from its file, only the configuration of this solver is used
+        results = BatchVerifier.verify_all(batch_pattern, timeout, greedy_ratio, final_greedy_ratio, processes,
+                                             aggregate, trace_file, create_solver(1, Fraction(1)))
+        BatchVerifier.print_results(results)
+        exit(0 if all(result["passed"] for result in results) else 1)
+
+    if bisect_interval is not None:
+        handle_bisection()
+        exit(0)
+
+    records = []
+    if resume_file is not None:
+        # m and c are taken from the journal, which is continued
+        records = SessionJournal.read_journal(resume_file)
+        if len(records) == 0 or records[0]["type"] != "start":
+            print("The journal %s does not start a session" % resume_file)
+            exit(1)
+        m, c = records[0]["m"], Fraction(records[0]["c"])
+        journal_file = resume_file
+    else:
+        m = int(input('Enter the number of machines\n'))
+        c = Fraction(input('Enter the competitive ratio\n'))
+    if search_mode:
+        handle_search()
+        exit(0)
+    solver = create_solver(m, c)
+    if trace_file is not None:
+        solver.trace = SolveTrace.SolveTrace(trace_file)
+    jobs_so_far = JobMultiset(m)
     rounds = [Round(1, m)]
+    if journal_file is not None:
+        solver.journal = SessionJournal.SessionJournal(journal_file)
+        if resume_file is None:
+            solver.journal.record_start(m, c)
+        else:
+            handle_resume()
     index = 2
 
     while True:
@@ -0,0 +1,109 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+import BinPackingSolver as BinPackingSolver_module
+from BinPackingSolver import BinPackingSolver, FEASIBLE, UNKNOWN
+from JobMultiset import JobMultiset
+from test_PreSolver import random_instance
+
+
+def solve(backend: str, jobs: [Fraction], cutoff_value: Fraction, m: int, greedy_ratio: float):
+    solver = BinPackingSolver(m, Fraction(3, 2), 5, cache_size=0, use_presolve=False)
+    solver.backend = backend
+    sub_round = solver.solve(JobMultiset(m, jobs), cutoff_value, jobs[-1], 1, False, greedy_ratio)
+    return sub_round, solver.last_report
+
+
+def test_auto_backend_falls_back_to_cp_if_the_small_jobs_do_not_fit():
+    # the configuration search packs the big jobs so that the small jobs do not fit greedily, CP-SAT finds a
+    # schedule in which they fit
+    jobs = sorted([Fraction(size, 100) for size in (1, 2, 3, 3, 4, 6, 6, 6, 7, 7, 8, 8, 8, 11, 13, 13, 14, 15, 17, 17,
+                                                    17, 18, 18, 18, 19, 19, 20, 33, 35, 36, 54, 60, 65, 71, 82)])
+    cutoff_value = Fraction(37067, 30000)
+    sub_round, report = solve("auto", jobs, cutoff_value, 6, 0.2)
+    assert sub_round is not None
+    assert report["result"] == FEASIBLE
+    assert report["stage"] == "cp"
+    assert sorted(job for machine in sub_round.schedule for job in machine) == jobs
+    assert all(sum(machine) <= cutoff_value for machine in sub_round.schedule)
+
+
+def test_greedy_failure_is_not_solved_again_with_a_longer_timeout():
+    # the big jobs of size 0.6 fit, but the small jobs of size 0.5 can not be added greedily to any schedule of them
+    solver = BinPackingSolver(2, Fraction(3, 2), 8, cache_size=0, use_presolve=False, initial_timeout=0.5)
+    solver.backend = "cp"
+    timeouts = []
+    solve_per_machine = solver.solve_per_machine
+
+    def record_timeout(*args):
+        timeouts.append(args[-2])
+        return solve_per_machine(*args)
+
+    solver.solve_per_machine = record_timeout
+    jobs = JobMultiset(2, [Fraction(1, 2), Fraction(1, 2), Fraction(3, 5), Fraction(3, 5)])
+    assert solver.solve_escalating(jobs, Fraction(1), Fraction(1, 2), 1, 0.6) is None
+    assert solver.last_report["result"] == UNKNOWN
+    assert not solver.last_report["timed_out"]
+    assert timeouts == [0.5]
+    # the unknown result is remembered for every timeout
+    assert solver.solve(jobs, Fraction(1), Fraction(1, 2), 1, False, 0.6, timeout=8) is None
+    assert solver.last_report["stage"] == "cache"
+    assert timeouts == [0.5]
+
+
+def test_unknown_instances_are_forgotten_beyond_the_capacity(monkeypatch):
+    monkeypatch.setattr(BinPackingSolver_module, "MAX_UNKNOWN_INSTANCES", 2)
+    solver = BinPackingSolver(2, Fraction(3, 2), 8, cache_size=0, use_presolve=False)
+    solver.backend = "cp"
+    for small_job in (Fraction(1, 2), Fraction(12, 25), Fraction(23, 50)):
+        jobs = JobMultiset(2, [small_job, small_job, Fraction(3, 5), Fraction(3, 5)])
+        assert solver.solve(jobs, Fraction(1), small_job, 1, False, 0.6) is None
+        assert solver.last_report["result"] == UNKNOWN
+    assert len(solver.unknown_timeouts) == 2
+    # the least recently used instance was forgotten and is solved again
+    jobs = JobMultiset(2, [Fraction(1, 2), Fraction(1, 2), Fraction(3, 5), Fraction(3, 5)])
+    solver.solve(jobs, Fraction(1), Fraction(1, 2), 1, False, 0.6)
+    assert solver.last_report["stage"] == "cp"
+
+
+def check_witness(indicator_variables: {(int, int): int}, multiplicity_per_job_size: {int: int}, capacity: int,
+                  m: int):
+    for job, count in multiplicity_per_job_size.items():
+        assert sum(indicator_variables.get((job, j), 0) for j in range(m)) == count
+    assert all(0 <= j < m for _, j in indicator_variables.keys())
+    assert all(sum(job * count for (job, machine), count in indicator_variables.items() if machine == j) <= capacity
+               for j in range(m))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_arc_flow_agrees_with_the_model_per_machine(seed):
+    rng = random.Random(seed)
+    capacity = 30
+    for _ in range(5):
+        multiplicity_per_job_size, m = random_instance(rng, capacity)
+        solver = BinPackingSolver(m, Fraction(3, 2), 10, aggregate=True, cache_size=0, use_presolve=False)
+        aggregated = solver.solve_aggregated(multiplicity_per_job_size, capacity)
+        aggregated_status = solver.last_report["cp_status"]
+        per_machine = solver.solve_per_machine(multiplicity_per_job_size, capacity)
+        assert aggregated_status in ("OPTIMAL", "FEASIBLE", "INFEASIBLE")
+        assert solver.last_report["cp_status"] in ("OPTIMAL", "FEASIBLE", "INFEASIBLE")
+        assert (aggregated is None) == (per_machine is None)
+        if aggregated is not None:
+            check_witness(aggregated, multiplicity_per_job_size, capacity, m)
+            check_witness(per_machine, multiplicity_per_job_size, capacity, m)
+
+
+@pytest.mark.parametrize("m", [5, 12])
+def test_arc_flow_schedules_a_subround(m):
+    # m jobs of size 0.6 and m jobs of size 0.4 fit exactly, one more job of size 0.4 does not
+    jobs = sorted([Fraction(3, 5)] * m + [Fraction(2, 5)] * m)
+    for aggregate in (True, False):
+        solver = BinPackingSolver(m, Fraction(3, 2), 10, aggregate=aggregate, cache_size=0, use_presolve=False)
+        solver.backend = "cp"
+        sub_round = solver.solve(JobMultiset(m, jobs), Fraction(1), Fraction(2, 5), m)
+        assert sub_round is not None
+        assert sorted(job for machine in sub_round.schedule for job in machine) == jobs
+        assert all(sum(machine) <= 1 for machine in sub_round.schedule)
+        assert solver.solve(JobMultiset(m, jobs + [Fraction(2, 5)]), Fraction(1), Fraction(2, 5), 1) is None
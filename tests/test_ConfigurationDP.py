@@ -0,0 +1,44 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from BinPackingSolver import BinPackingSolver, FEASIBLE, INFEASIBLE
+from ConfigurationDP import solve_configurations
+from JobMultiset import JobMultiset
+
+
+def solve(backend: str, jobs: [Fraction], cutoff_value: Fraction, m: int):
+    solver = BinPackingSolver(m, Fraction(3, 2), 10, cache_size=0, use_presolve=False)
+    solver.backend = backend
+    sub_round = solver.solve(JobMultiset(m, jobs), cutoff_value, jobs[-1], 1)
+    return sub_round, solver.last_report
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_configuration_search_agrees_with_cp_sat(seed):
+    rng = random.Random(seed)
+    m = rng.randint(1, 4)
+    sizes = [Fraction(rng.randint(5, 60), 100) for _ in range(rng.randint(1, 4))]
+    jobs = sorted(rng.choice(sizes) for _ in range(rng.randint(m, 3 * m)))
+    # cutoff values around the average load give feasible and infeasible instances
+    cutoff_value = max(jobs[-1], sum(jobs) / m * Fraction(rng.randint(90, 125), 100))
+
+    sub_round, report = solve("dp", jobs, cutoff_value, m)
+    _, cp_report = solve("cp", jobs, cutoff_value, m)
+    assert report["stage"] == "dp"
+    assert cp_report["result"] in (FEASIBLE, INFEASIBLE)
+    assert report["result"] == cp_report["result"]
+    if sub_round is not None:
+        assert sorted(job for machine in sub_round.schedule for job in machine) == jobs
+        assert all(sum(machine) <= cutoff_value for machine in sub_round.schedule)
+
+
+def test_witness_uses_every_job_within_the_capacity():
+    multiplicity_per_job_size = {7: 3, 5: 4, 3: 5}
+    indicator_variables, status, _ = solve_configurations(multiplicity_per_job_size, 15, 4)
+    assert status == "FEASIBLE"
+    for job, multiplicity in multiplicity_per_job_size.items():
+        assert sum(indicator_variables.get((job, j), 0) for j in range(4)) == multiplicity
+    assert all(sum(job * count for (job, machine), count in indicator_variables.items() if machine == j) <= 15
+               for j in range(4))
@@ -0,0 +1,40 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from ConfigurationLP import ConfigurationLP
+from PreSolver import lower_bound_l2
+from test_PreSolver import random_instance, solve_by_cp_sat
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lp_filter_never_rejects_a_feasible_instance(seed):
+    rng = random.Random(seed)
+    capacity = 30
+    job_per_coefficient = {size: Fraction(size, capacity) for size in range(1, capacity + 1)}
+    # one filter for all instances, so that the dual solutions of previous instances are reused like in a search
+    lp_filter = ConfigurationLP()
+    proven = 0
+    for _ in range(10):
+        multiplicity_per_job_size, m = random_instance(rng, capacity)
+        if lp_filter.proves_infeasibility(multiplicity_per_job_size, capacity, m, job_per_coefficient):
+            proven += 1
+            assert solve_by_cp_sat(multiplicity_per_job_size, capacity, m) != "feasible"
+    assert lp_filter.decided == proven
+
+
+def test_lp_filter_decides_instances_that_l2_can_not():
+    rng = random.Random(0)
+    capacity = 30
+    job_per_coefficient = {size: Fraction(size, capacity) for size in range(1, capacity + 1)}
+    lp_filter = ConfigurationLP()
+    decided_by_lp_only = 0
+    for _ in range(50):
+        multiplicity_per_job_size, m = random_instance(rng, capacity)
+        if lp_filter.proves_infeasibility(multiplicity_per_job_size, capacity, m, job_per_coefficient):
+            decided_by_lp_only += lower_bound_l2(multiplicity_per_job_size, capacity) <= m
+        else:
+            # the LP bound is at least as strong as L2
+            assert lower_bound_l2(multiplicity_per_job_size, capacity) <= m
+    assert decided_by_lp_only > 0
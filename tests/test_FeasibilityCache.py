@@ -0,0 +1,62 @@
+import functools
+import random
+from fractions import Fraction
+
+import pytest
+
+from FeasibilityCache import FeasibilityCache
+
+
+def random_counts(rng: random.Random, sizes: [Fraction], largest_count: int) -> ((Fraction, int), ...):
+    """
+    :returns:   some of the sizes with a random number of jobs sorted by decreasing size like the keys of the cache
+    """
+    counts = {size: rng.randint(1, largest_count) for size in rng.sample(sizes, rng.randint(1, len(sizes)))}
+    return tuple(sorted(counts.items(), reverse=True))
+
+
+def is_dominated_by_matching(smaller_jobs, larger_jobs) -> bool:
+    """
+    tries every size of a larger job for every smaller job, the remaining larger jobs are memoized per position
+    """
+    smaller = FeasibilityCache.expand(smaller_jobs)
+    larger_sizes = [size for size, _ in larger_jobs]
+
+    @functools.lru_cache(maxsize=None)
+    def can_match(index: int, remaining: (int, ...)) -> bool:
+        if index == len(smaller):
+            return True
+        return any(can_match(index + 1, remaining[:i] + (count - 1,) + remaining[i + 1:])
+                   for i, (size, count) in enumerate(zip(larger_sizes, remaining))
+                   if count > 0 and size >= smaller[index])
+
+    return can_match(0, tuple(count for _, count in larger_jobs))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_is_dominated_agrees_with_every_matching(seed):
+    rng = random.Random(seed)
+    sizes = [Fraction(numerator, 12) for numerator in range(1, 9)]
+    for _ in range(20):
+        smaller_jobs, larger_jobs = random_counts(rng, sizes, 2), random_counts(rng, sizes, 3)
+        assert FeasibilityCache.is_dominated(smaller_jobs, larger_jobs) == \
+               is_dominated_by_matching(smaller_jobs, larger_jobs)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_transfer_schedule_keeps_the_jobs_and_does_not_increase_loads(seed):
+    rng = random.Random(seed)
+    sizes = [Fraction(numerator, 12) for numerator in range(1, 9)]
+    m = rng.randint(1, 4)
+    scheduled_jobs = random_counts(rng, sizes, 3)
+    schedule = [[] for _ in range(m)]
+    for job in FeasibilityCache.expand(scheduled_jobs):
+        schedule[rng.randrange(m)].append(job)
+    jobs = random_counts(rng, sizes, 3)
+    while not FeasibilityCache.is_dominated(jobs, scheduled_jobs):
+        jobs = random_counts(rng, sizes, 3)
+
+    result = FeasibilityCache.transfer_schedule(tuple(tuple(machine) for machine in schedule), scheduled_jobs, jobs)
+    assert len(result) == m
+    assert sorted(job for machine in result for job in machine) == sorted(FeasibilityCache.expand(jobs))
+    assert all(sum(new_machine) <= sum(machine) for new_machine, machine in zip(result, schedule))
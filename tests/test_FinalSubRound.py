@@ -0,0 +1,30 @@
+from fractions import Fraction
+
+import pytest
+
+from BinPackingSolver import BinPackingSolver
+from FinalSubRound import FinalSubRound
+
+
+def test_final_job_that_is_left_raises_value_error():
+    solver = BinPackingSolver(1, Fraction(3, 2), 1)
+    # the final job is scheduled greedily and does not fit
+    with pytest.raises(ValueError):
+        FinalSubRound({}, [], [Fraction(1, 2)], Fraction(1, 4), Fraction(1, 2), 1, 1, Fraction(3, 2), solver)
+
+
+def test_upscaling_is_searched_once_for_the_same_jobs_left(monkeypatch):
+    calls = []
+
+    def find_additional_machines(self, other_jobs, largest_factor):
+        calls.append((tuple(self.jobs_left), tuple(other_jobs)))
+        return None, None
+
+    monkeypatch.setattr(FinalSubRound, "find_additional_machines", find_additional_machines)
+    solver = BinPackingSolver(1, Fraction(3, 2), 1)
+    big, small = Fraction(1, 2), Fraction(3, 10)
+    # the big job is the final job, the small job does not fit next to it
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            FinalSubRound({(big, 0): 1}, [big], [small], Fraction(3, 5), big, 1, 1, Fraction(3, 2), solver)
+    assert calls == [((small,), ())]
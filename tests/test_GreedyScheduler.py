@@ -0,0 +1,37 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+import GreedyScheduler
+
+
+def schedule_greedily_by_sorting(small_jobs: [Fraction], schedule: [[Fraction]], cutoff_value: Fraction) -> [Fraction]:
+    """
+    reference that sorts the machines by load before every job
+    """
+    jobs_left = []
+    for job in reversed(small_jobs):
+        schedule.sort(key=lambda machine: (sum(machine), machine))
+        if sum(schedule[0]) + job <= cutoff_value:
+            schedule[0].append(job)
+        else:
+            jobs_left.append(job)
+    return jobs_left
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_heap_and_sorting_give_the_same_schedule(seed):
+    rng = random.Random(seed)
+    m = rng.randint(1, 6)
+    # few distinct sizes and empty machines produce ties between machines
+    sizes = [Fraction(rng.randint(1, 30), rng.choice([10, 12, 35])) for _ in range(4)]
+    schedule = [sorted((rng.choice(sizes) for _ in range(rng.randint(0, 3))), reverse=True) for _ in range(m)]
+    small_jobs = sorted(rng.choice(sizes) / 4 for _ in range(rng.randint(0, 15)))
+    cutoff_value = Fraction(rng.randint(10, 40), 10)
+
+    reference_schedule = [list(machine) for machine in schedule]
+    reference_jobs_left = schedule_greedily_by_sorting(small_jobs, reference_schedule, cutoff_value)
+    jobs_left = GreedyScheduler.schedule_greedily(small_jobs, schedule, cutoff_value)
+    assert jobs_left == reference_jobs_left
+    assert schedule == reference_schedule
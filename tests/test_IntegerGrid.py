@@ -0,0 +1,14 @@
+import math
+import random
+
+import pytest
+
+from IntegerGrid import gcd, lcm
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_gcd_and_lcm_of_several_values(seed):
+    rng = random.Random(seed)
+    values = [rng.randint(1, 10 ** 6) for _ in range(rng.randint(0, 5))]
+    assert gcd(*values) == math.gcd(*values)
+    assert lcm(*values) == math.lcm(*values)
@@ -0,0 +1,69 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from BinPackingSolver import BinPackingSolver, FEASIBLE, INFEASIBLE
+from JobMultiset import JobMultiset
+from PreSolver import lower_bound_l1, lower_bound_l2, pack_decreasing
+
+
+def solve_by_cp_sat(multiplicity_per_job_size: {int: int}, capacity: int, m: int) -> str:
+    """
+    :returns:   the result of CP-SAT for the jobs of size job / capacity on m machines with the cutoff value 1
+    """
+    solver = BinPackingSolver(m, Fraction(3, 2), 10, cache_size=0, use_presolve=False)
+    solver.backend = "cp"
+    jobs = sorted(Fraction(job, capacity) for job, count in multiplicity_per_job_size.items() for _ in range(count))
+    solver.solve(JobMultiset(m, jobs), Fraction(1), jobs[-1], 1)
+    return solver.last_report["result"]
+
+
+def random_instance(rng: random.Random, capacity: int) -> ({int: int}, int):
+    """
+    :returns:   jobs of medium size whose total load is 85 to 100 percent of the capacity of the machines, which are
+                hard for the bounds and the heuristics, and the number of machines
+    """
+    m = rng.randint(2, 4)
+    total_load = m * capacity * rng.randint(85, 100) // 100
+    multiplicity_per_job_size, load = {}, 0
+    while load < total_load:
+        job = rng.randint(capacity // 5, capacity * 3 // 5)
+        multiplicity_per_job_size[job] = multiplicity_per_job_size.get(job, 0) + 1
+        load += job
+    return multiplicity_per_job_size, m
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_bounds_and_packings_agree_with_cp_sat(seed):
+    rng = random.Random(seed)
+    capacity = 30
+    for _ in range(10):
+        multiplicity_per_job_size, m = random_instance(rng, capacity)
+        result = solve_by_cp_sat(multiplicity_per_job_size, capacity, m)
+        assert result in (FEASIBLE, INFEASIBLE)
+        # a lower bound above m rejects the instance, so it must never exceed m for a feasible instance
+        if result == FEASIBLE:
+            assert lower_bound_l1(multiplicity_per_job_size, capacity) <= m
+            assert lower_bound_l2(multiplicity_per_job_size, capacity) <= m
+        for best_fit in (False, True):
+            assignment = pack_decreasing(multiplicity_per_job_size, capacity, m, best_fit)
+            if assignment is None:
+                continue
+            assert result == FEASIBLE
+            for job, count in multiplicity_per_job_size.items():
+                assert sum(assignment[(job, j)] for j in range(m)) == count
+            assert all(sum(job * assignment[(job, j)] for job in multiplicity_per_job_size.keys()) <= capacity
+                       for j in range(m))
+
+
+def test_l2_is_at_least_l1_and_decides_more_instances():
+    rng = random.Random(0)
+    decided_by_l1, decided_by_l2 = 0, 0
+    for _ in range(200):
+        multiplicity_per_job_size, m = random_instance(rng, 30)
+        l1, l2 = lower_bound_l1(multiplicity_per_job_size, 30), lower_bound_l2(multiplicity_per_job_size, 30)
+        assert l2 >= l1
+        decided_by_l1 += l1 > m
+        decided_by_l2 += l2 > m
+    assert decided_by_l2 > decided_by_l1
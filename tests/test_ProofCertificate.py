@@ -0,0 +1,88 @@
+import copy
+import os
+
+import pytest
+
+import BatchVerifier
+import ProofCertificate
+
+INPUT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Inputs", "Input1_85.txt")
+
+
+@pytest.fixture(scope="module")
+def certificate() -> dict:
+    result = BatchVerifier.verify_sequence(INPUT_FILE, 10, 0.01, 0.2)
+    assert result["passed"]
+    m, c, _, _ = BatchVerifier.parse_input_file(INPUT_FILE)
+    return ProofCertificate.create_certificate(result["rounds"], m, c)
+
+
+def tampered(certificate: dict, change) -> [str]:
+    forged = copy.deepcopy(certificate)
+    change(forged)
+    return ProofCertificate.verify_certificate(forged)
+
+
+def test_valid_certificate(certificate):
+    assert ProofCertificate.verify_certificate(certificate) == []
+
+
+def test_machine_types_with_negative_multiplicity_are_rejected(certificate):
+    def change(forged):
+        forged["rounds"][0][0]["schedule"] += [[1, []], [-1, []]]
+    assert len(tampered(certificate, change)) > 0
+
+
+def test_negative_job_counts_are_rejected(certificate):
+    def change(forged):
+        # the counts cancel, so the jobs of the witness are unchanged
+        size_id = forged["rounds"][0][0]["size"]
+        forged["rounds"][0][0]["schedule"][0][1] += [[size_id, 1], [size_id, -1]]
+    assert len(tampered(certificate, change)) > 0
+
+
+def test_zero_multiplicities_are_rejected(certificate):
+    def change(forged):
+        forged["rounds"][0].append({"size": 0, "multiplicity": 0, "cutoff": forged["rounds"][0][0]["cutoff"],
+                                    "schedule": forged["rounds"][0][0]["schedule"]})
+    assert len(tampered(certificate, change)) > 0
+
+
+def test_unknown_size_ids_are_reported(certificate):
+    def change(forged):
+        forged["final"]["size"] = len(forged["sizes"])
+    assert any("unknown size id" in error for error in tampered(certificate, change))
+
+    def change_composition(forged):
+        forged["final"]["schedule"][0][1].append([len(forged["sizes"]) + 5, 1])
+    assert len(tampered(certificate, change_composition)) > 0
+
+
+@pytest.mark.parametrize("key", ["m", "c", "sizes", "rounds", "final", "final_m"])
+def test_missing_entries_are_reported(certificate, key):
+    def change(forged):
+        del forged[key]
+    assert tampered(certificate, change) == ["missing entries: " + key]
+
+
+def test_malformed_entries_are_reported(certificate):
+    def change(forged):
+        del forged["rounds"][1][0]["cutoff"]
+        forged["rounds"][0][0]["schedule"][0] = [1]
+        forged["sizes"][0] = "1/0"
+    assert len(tampered(certificate, change)) > 0
+
+
+def test_smaller_cutoff_value_is_rejected(certificate):
+    def change(forged):
+        forged["rounds"][0][0]["cutoff"] = "1/1000"
+    assert len(tampered(certificate, change)) > 0
+
+
+def test_missing_jobs_are_rejected(certificate):
+    def change(forged):
+        # the machine type with the largest load is used once less, so the witness lacks its jobs
+        schedule = forged["final"]["schedule"]
+        schedule[0][0] -= 1
+        schedule.append([1, []])
+    assert len(tampered(certificate, change)) > 0
@@ -0,0 +1,19 @@
+from fractions import Fraction
+
+import pytest
+
+from SubRound import SubRound
+
+
+def test_schedule_can_not_be_changed_in_place():
+    half, third = Fraction(1, 2), Fraction(1, 3)
+    sub_round = SubRound({(half, 0): 1, (half, 1): 1, (third, 0): 1, (third, 1): 1}, [half, half, third, third], [],
+                         Fraction(1), third, 2, 2, Fraction(3, 2))
+    assert sub_round.schedule == ((half, third), (half, third))
+    with pytest.raises((TypeError, AttributeError)):
+        sub_round.schedule[0].append(third)
+    with pytest.raises(TypeError):
+        sub_round.schedule[0] = (half,)
+    # a schedule that is assigned replaces the compact schedule
+    sub_round.schedule = [[half, third, third], [half]]
+    assert sub_round.schedule == ((half, third, third), (half,))